@@ -4,7 +4,7 @@ import tkinter.ttk as ttk
 from tkinter import filedialog, messagebox
 
 class JSONTreeFrame(ttk.Frame):
-    def __init__(self, master):
+    def __init__(self, master, lazy: bool = False):
         super().__init__(master)
         self.pack(fill=tk.BOTH, expand=True)
         self.control_frame = ttk.Frame(self)
@@ -13,6 +13,8 @@ class JSONTreeFrame(ttk.Frame):
         ttk.Button(self.control_frame, text="save JSON file", command=self.save_json_file).pack(side=tk.LEFT)
         ttk.Button(self.control_frame, text="expand", command=self.expand_tree).pack(side=tk.LEFT)
         ttk.Button(self.control_frame, text="collape", command=lambda: self.expand_tree(expand=False)).pack(side=tk.LEFT)
+        self.lazy = tk.BooleanVar(self, value=lazy)  # lazy mode: tree nodes are only populated when opened
+        ttk.Checkbutton(self.control_frame, text="lazy", variable=self.lazy).pack(side=tk.LEFT)
         
         tree_frame = ttk.Frame(self)
         tree_frame.pack(fill=tk.BOTH, expand=True)
@@ -28,6 +30,10 @@ class JSONTreeFrame(ttk.Frame):
         self.tree.configure(yscroll=ysb.set)
         ysb.grid(row=0, column=1, sticky="ns")        
         self.tree.bind("<Double-1>", self.on_double_click)
+        self.tree.bind("<<TreeviewOpen>>", self.on_tree_open)
+        self.tree.bind("<<TreeviewClose>>", self.on_tree_close)
+        
+        self.lazy_values = {}  # values of (lazy mode) tree nodes, whose children are not yet inserted
         
         self.path = os.path.dirname(__file__)
         with open(os.path.join(self.path, "combo_choice.json"), "r") as file:
@@ -48,8 +54,8 @@ class JSONTreeFrame(ttk.Frame):
         selected_node = self.tree.focus()  # node id like "I001"
         selected_item = self.tree.item(selected_node)
         
-        if "NoneType" in selected_item["tags"]:
-            return  # no editing of NoneType items
+        if "NoneType" in selected_item["tags"] or "placeholder" in selected_item["tags"]:
+            return  # no editing of NoneType items and lazy mode placeholders
         
         if region == "tree":
             selected_value = selected_item["text"]
@@ -138,7 +144,8 @@ class JSONTreeFrame(ttk.Frame):
     
     def expand_tree(self, expand: bool = True) -> None:
         for item in self.get_all_children():
-            self.tree.item(item, open=expand)
+            if item not in self.lazy_values:  # lazy nodes are populated when opened by the user
+                self.tree.item(item, open=expand)
             
                      
     def load_json_file(self) -> None:
@@ -155,8 +162,12 @@ class JSONTreeFrame(ttk.Frame):
             messagebox.showwarning(title="Warning", message=f"Could not open '{fp}'!")
         else:        
             self.delete_tree_nodes()
-            self.insert_tree_node(file.name, value=obj)
-            self.expand_tree()
+            if self.lazy.get():
+                self.insert_tree_node(file.name, value=obj, levels=1)
+                self.tree.item(self.tree.get_children()[0], open=True)
+            else:
+                self.insert_tree_node(file.name, value=obj)
+                self.expand_tree()
 
 
     def save_json_file(self):
@@ -174,7 +185,7 @@ class JSONTreeFrame(ttk.Frame):
             messagebox.showwarning(title="Warning", message=f"Could not open '{fp}'!")
         
 
-    def insert_tree_node(self, field: str, value: object, node: str = '') -> None:
+    def insert_tree_node(self, field: str, value: object, node: str = '', levels: int = None) -> None:
         """Inserts a tree node (consisting of field name and value) at the node (tree position).
         If value is a (JSON-able) tree object (incl. lists and dicts) it will be inserted hierarchically.
 
@@ -182,25 +193,63 @@ class JSONTreeFrame(ttk.Frame):
             field (str): field name in the tree
             value (JSON-able object): Value in the tree
             node (str, optional): _description_. Defaults to ''.
+            levels (int, optional): Number of child levels to be inserted below the node. The children
+                of deeper dicts and lists are represented by a placeholder and inserted when the node is
+                opened (lazy mode). Defaults to None (insert all levels).
         """
         type_tag = str(type(value)).split("'")[1]
-        if type(value) is dict:
+        if type(value) in (dict, list):
             node = self.tree.insert(node, tk.END, text=field, tags=type_tag)
-            for key, val in value.items():
-                self.insert_tree_node(key, val, node)
-                
-        elif type(value) is list:
-            node = self.tree.insert(node, tk.END, text=field, tags=type_tag)
-            for i, val in enumerate(value):
-                self.insert_tree_node(i, val, node)
+            if levels is not None and levels <= 0 and len(value):
+                self.lazy_values[node] = value
+                self.tree.insert(node, tk.END, text="...", tags="placeholder")
+                return
+            
+            levels = None if levels is None else levels - 1
+            items = value.items() if type(value) is dict else enumerate(value)
+            for key, val in items:
+                self.insert_tree_node(key, val, node, levels)
 
         else:
             self.tree.insert(node, tk.END, text=field, values=[value], tags=type_tag)        
         
         
+    def populate_tree_node(self, node: str) -> None:
+        """Replaces the placeholder of a lazy tree node by its children (one level)
+        """
+        value = self.lazy_values.pop(node, None)
+        if value is None:
+            return
+        
+        self.tree.delete(*self.tree.get_children(node))
+        items = value.items() if type(value) is dict else enumerate(value)
+        for key, val in items:
+            self.insert_tree_node(key, val, node, levels=0)
+    
+    
+    def on_tree_open(self, event: tk.Event) -> None:
+        self.populate_tree_node(self.tree.focus())  # the opened node has the focus
+        
+        
+    def on_tree_close(self, event: tk.Event) -> None:
+        """Drops the children of a closed node in lazy mode, such that only visible nodes occupy the tree
+        """
+        node = self.tree.focus()
+        children = self.tree.get_children(node)
+        if not self.lazy.get() or not children or node in self.lazy_values:
+            return
+        
+        self.lazy_values[node] = self.extract_obj_from_tree(node)
+        for child in self.get_all_children(node):
+            self.lazy_values.pop(child, None)
+        self.tree.delete(*children)
+        self.tree.insert(node, tk.END, text="...", tags="placeholder")
+        
+        
     def delete_tree_nodes(self):
         for child in self.tree.get_children():
             self.tree.delete(child)
+        self.lazy_values.clear()
 
 
     def extract_obj_from_tree(self, node: str = "I001") -> object:
@@ -212,6 +261,9 @@ class JSONTreeFrame(ttk.Frame):
         Returns:
             object: Python object extracted from the treeview
         """
+        if node in self.lazy_values:  # children not inserted (lazy mode)
+            return self.lazy_values[node]
+        
         if not self.tree.exists(node):
             return None
         
@@ -1,39 +1,116 @@
-import json, os
+import contextlib, json, logging, os, time
+from collections import OrderedDict
+from array import array
 import tkinter as tk
 import tkinter.ttk as ttk
-from tkinter import filedialog, messagebox
+
+from background import BackgroundTask
+from compression import DEFAULT_LEVEL, base_extension
+from json_bulk import bulk_set, compile_edit
+from json_cache import CACHE_SIZE, DocumentCache, document_key
+from json_history import EditHistory
+from json_log import EditLog, file_version, read_log, replay_log
+from json_diff import Comparison
+from json_query import QueryResults, compile_query
+from json_document import (JSONDocument, JSONLinesDocument, MappedDocument, compare_documents, load_document, load_documents, 
+                           reload_document, save_document, type_tag)
+from json_scan import MappedList, Unparsed
+from json_table import ColumnTable, parse_condition, table_keys
+from profiling import Instrumentation, format_phase, profile_session
+
+
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")  # files, that are loaded as JSONLinesDocument
+FILETYPES = [("JSON files", "*.json *.json.gz *.json.xz *.json.bz2"), ("JSON Lines files", "*.jsonl *.ndjson *.jsonl.gz *.jsonl.xz *.jsonl.bz2"), 
+             ("Compressed files", "*.gz *.xz *.bz2"), ("All Files", "*.*")]
+POLL_INTERVAL = 50     # ms, interval of polling the BackgroundTask from the Tkinter main loop
+SEARCH_DELAY = 200     # ms, delay of the incremental search after the last keystroke
+AUTOSAVE_IDLE = 30000  # ms, idle time after the last edit, until the logged edits are saved to the file
+WATCH_INTERVAL = 1000  # ms, interval of polling the size and modification time of the watched file
+MAX_REVEALED = 1000    # max. number of search matches, that are inserted (lazy mode) and shown by the filter
+TABLE_ROWS = 1000      # max. number of rows shown by a TableView, the others are reached by sorting and filtering
+BUCKET_SIZE = 1000     # max. number of list items per tree level, longer lists are split into range buckets
+QUERY_RESULTS = 8      # number of recent queries, whose matches are kept and updated incrementally
+MATCH_COLOR = "#c8e0f8"  # background of the query matches
+DIFF_COLORS = {"added": "#c8f0c8", "removed": "#f4c8c8", "changed": "#f8f0b0", "type": "#f8d8a8"}  # CompareView highlights
+COMBO_CHOICES = {}     # combo_choice.json path -> (modification time, choices), see load_combo_choice
+
+
+def load_combo_choice(fp: str) -> dict:
+    """Returns the choices per field name of a combo_choice.json. The file is parsed on the first call and
+    again only when its modification time changes. A missing file has no choices.
+    """
+    try:
+        mtime = os.stat(fp).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    cached = COMBO_CHOICES.get(fp)
+    if cached is None or cached[0] != mtime:
+        with open(fp, "r") as file:
+            cached = COMBO_CHOICES[fp] = (mtime, json.load(file))
+    return cached[1]
+
+
+def bucket_span(start: int, stop: int) -> int:
+    """Returns the number of list items per bucket for the list items start..stop-1 (a power of 
+    BUCKET_SIZE, such that there are at most BUCKET_SIZE buckets) or 0, if no buckets are needed
+    """
+    if stop - start <= BUCKET_SIZE:
+        return 0
+    span = BUCKET_SIZE
+    while stop - start > span * BUCKET_SIZE:
+        span *= BUCKET_SIZE
+    return span
+
+
+def array_summary(value: array) -> str:
+    """Returns the value shown in the row of a compact array, like "1000 items: min 0, max 999, mean 499.5"
+    """
+    return f"{len(value)} items: min {min(value)}, max {max(value)}, mean {sum(value) / len(value):.6g}"
+
+
+def iter_list_items(value: list, start: int, stop: int):
+    """Yields the (index, item) of a list from start to stop-1, or (range, None) for the buckets of these
+    items if there are more than BUCKET_SIZE
+    """
+    span = bucket_span(start, stop)
+    if span:
+        for i in range(start, stop, span):
+            yield range(i, min(i + span, stop)), None
+    else:
+        for i in range(start, stop):
+            yield i, value[i]
 
 
 class EntryPopup(ttk.Entry):
     """Popup edit widget for str, int and float type fields
     """
-    def __init__(self, parent, iid, col, inital_value, **kwargs):
+    def __init__(self, parent, doc, path, col, inital_value, **kwargs):
         super().__init__(parent, **kwargs)
         self.tree = parent
-        self.iid = iid
+        self.doc = doc
+        self.path = path
         self.col = col
 
         self.insert(0, inital_value)
         self.select_range(0, tk.END)
 
     def update(self):
-        """Updates the tree value at the respective iid (row) and column and
-           depending on the type of the value (specified in tags)
+        """Updates the document at the respective JSON path (row) and column depending on the type of the 
+           document value. The tree is updated by the document listener, see JSONTreeFrame.on_document_change
         """
         new_value = self.get()
         if self.col == '#0':
-            self.tree.item(self.iid, text=new_value)
+            self.doc.rename(self.path, new_value)
         else:
-            tags = self.tree.item(self.iid)["tags"]
+            old_value = self.doc.get(self.path)
             try:
-                if "int" in tags:
+                if type(old_value) is int:
                     new_value = int(new_value)
-                elif "float" in tags:
+                elif type(old_value) is float:
                     new_value = float(new_value)
-            except ValueError:
-                pass   # don't do a change if conversion fails
-            else:  
-                self.tree.item(self.iid, values=[new_value])
+                self.doc.set(self.path, new_value)
+            except (ValueError, OverflowError):
+                pass   # don't do a change if conversion fails or the int doesn't fit into a compact array
         self.tree.focus_set()
         self.destroy()
 
@@ -41,16 +118,17 @@ class EntryPopup(ttk.Entry):
 class ComboPopup(ttk.Combobox):
     """Popup edit widget for str type fields with combo_choice
     """
-    def __init__(self, parent, iid, inital_value, **kwargs):
+    def __init__(self, parent, doc, path, inital_value, **kwargs):
         super().__init__(parent, state="readonly", **kwargs)
         self.tree = parent
-        self.iid = iid
+        self.doc = doc
+        self.path = path
         self.choices = kwargs["values"]
 
         self.set(inital_value)
 
     def update(self):
-        self.tree.item(self.iid, values=[self.get()])
+        self.doc.set(self.path, self.get())
         self.tree.focus_set()
         self.destroy()
         
@@ -58,30 +136,130 @@ class ComboPopup(ttk.Combobox):
 class CheckPopup(ttk.Checkbutton):
     """Popup edit widget for bool type fields
     """
-    def __init__(self, parent, iid, inital_value, **kwargs):
+    def __init__(self, parent, doc, path, inital_value, **kwargs):
         self.is_checked = tk.BooleanVar(parent)
-        self.is_checked.set("True" == inital_value)  # Treeview stores also bools as str!
+        self.is_checked.set(inital_value)
         super().__init__(parent, onvalue=True, offvalue=False, variable=self.is_checked, **kwargs)
         self.tree = parent
-        self.iid = iid
+        self.doc = doc
+        self.path = path
 
     def update(self):
         checked = "selected" in self.state()
-        self.tree.item(self.iid, values=[checked])
+        self.doc.set(self.path, checked)
         self.tree.focus_set()
         self.destroy()
 
                 
+def open_popup(tree: ttk.Treeview, doc: JSONDocument, path: tuple, rowid: str, column: str, value: object, 
+               get_combo_choice) -> tk.Widget:
+    """Places the edit popup of a cell over the cell (rowid, column) of a Treeview, that edits the value at
+    the JSON path of the document. get_combo_choice returns the choices per field name and is only called 
+    for the popup of a (not bool) value, such that combo_choice.json isn't read for other edits.
+
+    Returns:
+        tk.Widget: EntryPopup, ComboPopup (for the keys of combo_choice) or CheckPopup (for bool values)
+    """
+    # get cell position info
+    x, y, width, height = tree.bbox(rowid, column)
+    y += height / 2
+    height *= 1.2    # make the popup a little larger than the regular cell
+            
+    choices = None if type(value) is bool or column == "#0" or not path else get_combo_choice().get(path[-1])
+    if type(value) is bool:
+        popup = CheckPopup(tree, doc, path, value)
+                
+    elif choices is not None:
+        popup = ComboPopup(tree, doc, path, value, values=choices)
+        
+    else:
+        popup = EntryPopup(tree, doc, path, column, value)
+        
+    popup.focus()                                           # This code would usually be in 
+    popup.bind("<Return>", lambda event: popup.update())    # the Popup __init__, but that 
+    popup.bind("<Escape>", lambda event: (tree.focus_set(), popup.destroy()))  # would result in 3 copies  
+    popup.place(x=x, y=y, width=width, height=height, anchor='w')
+    return popup
+
+
 class JSONTreeFrame(ttk.Frame):
-    def __init__(self, master):
+    def __init__(self, master, lazy: bool = False, insert_batch_size: int = 1000, insert_time_budget: float = 0.008,
+                 cache: DocumentCache = None):
+        """Frame with a Treeview for viewing and editing JSON documents
+
+        Args:
+            master (tk.Widget): parent widget
+            lazy (bool, optional): Lazy mode, tree nodes are only populated when opened. Defaults to False.
+            insert_batch_size (int, optional): Max. number of tree nodes inserted per after_idle tick while
+                a document is shown. Defaults to 1000.
+            insert_time_budget (float, optional): Max. time [s] spent inserting tree nodes per after_idle 
+                tick, such that the GUI stays responsive. Defaults to 0.008.
+            cache (DocumentCache, optional): Cache of the parsed documents, that may be shared by several 
+                frames, see JSONWorkspace. Defaults to None (no caching).
+        """
         super().__init__(master)
         self.pack(fill=tk.BOTH, expand=True)
         self.control_frame = ttk.Frame(self)
         self.control_frame.pack(fill=tk.X)
         ttk.Button(self.control_frame, text="load JSON file", command=self.load_json_file).pack(side=tk.LEFT)
         ttk.Button(self.control_frame, text="save JSON file", command=self.save_json_file).pack(side=tk.LEFT)
-        ttk.Button(self.control_frame, text="expand", command=self.expand_tree).pack(side=tk.LEFT)
+        ttk.Button(self.control_frame, text="compare", command=self.compare_json_files).pack(side=tk.LEFT)
+        ttk.Button(self.control_frame, text="table", command=self.show_table).pack(side=tk.LEFT)
+        ttk.Button(self.control_frame, text="undo", command=self.undo).pack(side=tk.LEFT)
+        ttk.Button(self.control_frame, text="redo", command=lambda: self.undo(redo=True)).pack(side=tk.LEFT)
+        ttk.Button(self.control_frame, text="expand", command=lambda: self.expand_tree(depth=self.get_expand_depth())).pack(side=tk.LEFT)
+        self.expand_depth = tk.StringVar(self, value="all")  # number of levels expanded by the expand button
+        ttk.Spinbox(self.control_frame, textvariable=self.expand_depth, values=["all"] + list(range(1, 21)), width=3).pack(side=tk.LEFT)
+        ttk.Button(self.control_frame, text="expand selection", command=lambda: self.expand_tree(item=self.tree.focus())).pack(side=tk.LEFT)
         ttk.Button(self.control_frame, text="collape", command=lambda: self.expand_tree(expand=False)).pack(side=tk.LEFT)
+        self.lazy = tk.BooleanVar(self, value=lazy)  # lazy mode: tree nodes are only populated when opened
+        ttk.Checkbutton(self.control_frame, text="lazy", variable=self.lazy).pack(side=tk.LEFT)
+        self.mmap = tk.BooleanVar(self, value=False)  # files are loaded memory-mapped and read-only
+        ttk.Checkbutton(self.control_frame, text="mmap", variable=self.mmap).pack(side=tk.LEFT)
+        self.parse_lines = tk.BooleanVar(self, value=False)  # JSON Lines files are parsed completely (in parallel) and search indexed
+        ttk.Checkbutton(self.control_frame, text="parse lines", variable=self.parse_lines).pack(side=tk.LEFT)
+        self.watch = tk.BooleanVar(self, value=False)  # the file is reloaded, when it changes on disk
+        ttk.Checkbutton(self.control_frame, text="watch", variable=self.watch, command=self.poll_file).pack(side=tk.LEFT)
+        ttk.Label(self.control_frame, text="level").pack(side=tk.LEFT)
+        self.compress_level = tk.StringVar(self, value=str(DEFAULT_LEVEL))  # compression level of saved .gz, .xz and .bz2 files
+        ttk.Spinbox(self.control_frame, textvariable=self.compress_level, from_=1, to=9, width=2).pack(side=tk.LEFT)
+        self.progress = ttk.Progressbar(self.control_frame, mode="determinate", maximum=1.0, length=100)
+        self.progress.pack(side=tk.LEFT)
+        ttk.Button(self.control_frame, text="cancel", command=self.cancel_task).pack(side=tk.LEFT)
+        
+        self.search_frame = ttk.Frame(self)
+        self.search_frame.pack(fill=tk.X)
+        ttk.Label(self.search_frame, text="search").pack(side=tk.LEFT)
+        self.search_text = tk.StringVar(self)
+        self.search_text.trace_add("write", lambda *args: self.schedule_search())
+        search_entry = ttk.Entry(self.search_frame, textvariable=self.search_text)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        search_entry.bind("<Return>", lambda event: self.jump_to_match(1))
+        ttk.Button(self.search_frame, text="<", width=2, command=lambda: self.jump_to_match(-1)).pack(side=tk.LEFT)
+        ttk.Button(self.search_frame, text=">", width=2, command=lambda: self.jump_to_match(1)).pack(side=tk.LEFT)
+        self.search_filter = tk.BooleanVar(self, value=False)  # shows only the branches with matches
+        ttk.Checkbutton(self.search_frame, text="filter", variable=self.search_filter, command=self.search).pack(side=tk.LEFT)
+        self.search_info = ttk.Label(self.search_frame, width=12)  # like "3/17"
+        self.search_info.pack(side=tk.LEFT)
+        
+        self.query_frame = ttk.Frame(self)
+        self.query_frame.pack(fill=tk.X)
+        ttk.Label(self.query_frame, text="query").pack(side=tk.LEFT)
+        self.query_text = tk.StringVar(self)  # like "$.lanes[*].pattern" or "$..[?(@ > 0.5)]", see json_query
+        query_entry = ttk.Entry(self.query_frame, textvariable=self.query_text)
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        query_entry.bind("<Return>", lambda event: self.run_query())
+        ttk.Button(self.query_frame, text="<", width=2, command=lambda: self.jump_to_query_match(-1)).pack(side=tk.LEFT)
+        ttk.Button(self.query_frame, text=">", width=2, command=lambda: self.jump_to_query_match(1)).pack(side=tk.LEFT)
+        ttk.Button(self.query_frame, text="clear", command=self.clear_query).pack(side=tk.LEFT)
+        ttk.Label(self.query_frame, text="set matches to").pack(side=tk.LEFT)
+        self.bulk_text = tk.StringVar(self)  # value or expression of x like "=x*1.05", see json_bulk
+        bulk_entry = ttk.Entry(self.query_frame, textvariable=self.bulk_text, width=16)
+        bulk_entry.pack(side=tk.LEFT)
+        bulk_entry.bind("<Return>", lambda event: self.bulk_edit())
+        ttk.Button(self.query_frame, text="apply", command=self.bulk_edit).pack(side=tk.LEFT)
+        self.query_info = ttk.Label(self.query_frame, width=24)  # like "3/17" or a syntax error
+        self.query_info.pack(side=tk.LEFT)
         
         tree_frame = ttk.Frame(self)
         tree_frame.pack(fill=tk.BOTH, expand=True)
@@ -93,18 +271,69 @@ class JSONTreeFrame(ttk.Frame):
         self.tree.grid(row=0, column=0, sticky="nsew")
         self.tree.heading("#0", text="field")
         self.tree.heading("#1", text="value")
+        self.tree.tag_configure("match", background=MATCH_COLOR)
         ysb = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
         self.tree.configure(yscroll=ysb.set)
         ysb.grid(row=0, column=1, sticky="ns")        
         self.tree.bind("<Button-1>", lambda event: self.close_cell_popup())
         self.tree.bind("<Double-1>", self.on_double_click)
+        self.tree.bind("<<TreeviewOpen>>", self.on_tree_open)
+        self.tree.bind("<<TreeviewClose>>", self.on_tree_close)
         self.tree.bind("<Return>", self.on_return_press)
+        self.tree.bind("<Control-z>", lambda event: self.undo())
+        self.tree.bind("<Control-y>", lambda event: self.undo(redo=True))
+        
+        self.status_bar = ttk.Label(self, anchor="w")  # times and counts of the last phases, see show_phase
+        self.status_bar.pack(fill=tk.X)
+        self.instruments = Instrumentation()  # phase timers, node and Tcl call counters
+        self.instruments.count_tcl_calls(self.tree)
+        self.instruments.listeners.append(self.show_phase)
+        self.phases = {}         # phase -> record of its last run, shown in the status bar
+        self.task_phase = None   # record of the phase of the BackgroundTask
+        self.insert_phase = None  # record of the phase of the time-sliced insertion, see insert_records
         
         self.popup = None    # Popup widget for cell editing
+        self.table_views = []  # open TableViews of the document, that edit it with their own popups
+        self.batch = None    # document changes, whose tree updates are deferred, see batched_updates
+        self.task = None     # BackgroundTask for loading or saving
+        self.poll_job = None  # after() job of polling the BackgroundTask
+        self.insertion = None  # generator of the tree records, that are inserted in after_idle ticks
+        self.insert_job = None  # after_idle() job of the next batch of the insertion
+        self.insert_batch_size = insert_batch_size
+        self.insert_time_budget = insert_time_budget
+        self.search_job = None  # after() job of the incremental search
+        self.matches = []       # JSON paths of the search matches
+        self.match_index = -1
+        self.filtered = []      # tree nodes, whose children are filtered by the search
+        
+        self.doc = JSONDocument()  # document model, source of truth for the tree
+        self.history = EditHistory(self.doc)  # undo and redo of the document changes
+        self.edit_log = None     # EditLog of the file of the document, if it is a single editable file
+        self.autosave_job = None  # after() job of the autosave
+        self.file_path = None     # file of the document, if it is loaded from a single file
+        self.file_version = None  # size and modification time of the file, see json_log.file_version
+        self.changed_version = None  # file version, that is reloaded, if it doesn't change until the next poll
+        self.watch_job = None     # after() job of polling the watched file
+        self.cache = cache
+        self.cache_key = None     # document_key of the shown document, if it is cached
+        self.unloaded = set()      # (lazy mode) tree nodes, whose children are not yet inserted
+        self.buckets = {}          # bucket node -> (JSON path of the list, range of list indices)
+        self.bucket_nodes = {}     # (JSON path of the list, range of list indices) -> bucket node
+        self.highlights = {}       # JSON path -> highlight tag of its node, see set_highlights
+        self.query_results = OrderedDict()  # query text -> QueryResults of the document, least recently used first
+        self.query_matches = []    # JSON paths of the matches of the last query in document order
+        self.query_match_set = set()  # the same for node_tags
+        self.query_index = -1
+        self.query = None          # text of the query, whose matches are shown
         
         self.path = os.path.dirname(__file__)
-        with open(os.path.join(self.path, "combo_choice.json"), "r") as file:
-            self.combo_choice = json.load(file)
+
+
+    @property
+    def combo_choice(self) -> dict:
+        """Choices of the ComboPopup per field name, read from combo_choice.json on the first edit of a value
+        """
+        return load_combo_choice(os.path.join(self.path, "combo_choice.json"))
 
 
     def close_cell_popup(self):
@@ -115,6 +344,14 @@ class JSONTreeFrame(ttk.Frame):
             self.popup = None
             
             
+    def close_cell_popups(self) -> None:
+        """Closes the edit pop-ups of the frame and its TableViews, their edits are committed
+        """
+        self.close_cell_popup()
+        for view in self.table_views:
+            view.close_cell_popup()
+
+
     def on_return_press(self, event: tk.Event) -> None:
         self.make_popup(rowid=self.tree.focus(), column="#1")
 
@@ -136,165 +373,1569 @@ class JSONTreeFrame(ttk.Frame):
         if rowid == '':  # happens if clicked in empty space or header 
             return        
         
-        selected_item = self.tree.item(rowid)
+        if self.task:
+            return  # no editing while the document is loaded or saved in the background
         
-        if "NoneType" in selected_item["tags"]:
+        if rowid not in self.doc.iids:
+            return  # lazy mode placeholders and list buckets are not part of the document
+        
+        if self.doc.readonly:
+            return
+        
+        path = self.doc.iids[rowid]
+        value = self.doc.get(path)
+        
+        if value is None:
             return  # no editing of NoneType items
         
         if column == "#0":
-            selected_value = selected_item["text"]
+            selected_value = path[-1] if path else self.doc.name
+        elif type(value) in (dict, list, array):
+            return  # list, dict and array rows have no value (or a summary) -> not editable
         else:
-            try:
-                selected_value = selected_item["values"][0]
-            except IndexError:   # This happens in list and dict rows and value column -> not editable
-                return
+            selected_value = value
         
-        # get cell position info
-        x, y, width, height = self.tree.bbox(rowid, column)
-        y += height / 2
-        height *= 1.2    # make the popup a little larger than the regular cell
-                
-        if "bool" in selected_item["tags"]:
-            self.popup = CheckPopup(self.tree, rowid, selected_value)
-                    
-        elif column != "#0" and selected_item["text"] in self.combo_choice:
-            choices = self.combo_choice[selected_item["text"]]
-            self.popup = ComboPopup(self.tree, rowid, selected_value, values=choices)
-            
-        else:
-            self.popup = EntryPopup(self.tree, rowid, column, selected_value)
-            
-        self.popup.focus()                                                # This code would usually be in 
-        self.popup.bind("<Return>", lambda event: self.popup.update())    # the Popup __init__, but that 
-        self.popup.bind("<Escape>", self.on_escape)                       # would result in 3 copies  
-        self.popup.place(x=x, y=y, width=width, height=height, anchor='w')
+        self.popup = open_popup(self.tree, self.doc, path, rowid, column, selected_value, lambda: self.combo_choice)
 
 
-    def on_escape(self, event):
+    def show_phase(self, record: dict) -> None:
+        """Shows the last runs of the phases in the status bar, see Instrumentation
+        """
+        self.phases.pop(record["phase"], None)
+        self.phases[record["phase"]] = record  # the last phase is shown last
+        self.status_bar.configure(text=" | ".join(map(format_phase, self.phases.values())))
+        
+        
+    def undo(self, redo: bool = False) -> None:
+        """Undoes (or redoes) the last edit step of the document and selects its tree node, see EditHistory
+        """
+        self.close_cell_popup()
+        if self.task:
+            return
+        with self.batched_updates():
+            path = self.history.redo() if redo else self.history.undo()
+        node = self.reveal(path) if path is not None else None
+        if node:
+            self.tree.selection_set(node)
+            self.tree.focus(node)
+            self.tree.see(node)
         self.tree.focus_set()
-        self.popup.destroy()
+
+
+    def bulk_edit(self) -> None:
+        """Sets all query matches (or search matches, if no query is shown) to the value or expression of 
+        the bulk edit entry in one undo step, see json_bulk
+        """
+        self.close_cell_popup()
+        if self.task or self.doc.readonly:
+            return
+        paths = self.query_matches if self.query else self.matches
+        try:
+            edit = compile_edit(self.bulk_text.get())
+        except ValueError as e:
+            self.query_info.configure(text=str(e))
+            return
+        with self.batched_updates(), self.history.group():
+            count = bulk_set(self.doc, paths, edit, self.combo_choice)
+        self.query_info.configure(text=f"{count}/{len(paths)} set")
+        
+        
+    @contextlib.contextmanager
+    def batched_updates(self):
+        """Context for many document changes, whose tree rows are updated at once at the end (the Treeview 
+        is redrawn only after that) and the autosave is scheduled once
+        """
+        self.batch = []
+        try:
+            yield
+        finally:
+            batch, self.batch = self.batch, None
+            if batch:
+                self.schedule_autosave()
+                self.update_tree_rows(batch)
+        
         
-    
     def get_all_children(self, item: str = "") -> list[str]:
-        children = self.tree.get_children(item)
-        for child in children:
-            children += self.get_all_children(child)
+        children = []
+        stack = [item]
+        while stack:
+            item_children = self.tree.get_children(stack.pop())
+            children.extend(item_children)
+            stack.extend(item_children)
         return children
     
     
-    def expand_tree(self, expand: bool = True) -> None:
-        for item in self.get_all_children():
-            self.tree.item(item, open=expand)
+    def get_expand_depth(self) -> int:
+        """Returns the number of levels selected for the expand button, None for all levels
+        """
+        try:
+            return int(self.expand_depth.get())
+        except ValueError:
+            return None
+    
+    
+    def get_compress_level(self) -> int:
+        """Returns the selected compression level (1..9) of saved compressed files
+        """
+        try:
+            return min(max(int(self.compress_level.get()), 1), 9)
+        except ValueError:
+            return DEFAULT_LEVEL
+    
+    
+    def iter_container_nodes(self, item: str, depth: int = None, populate: bool = False):
+        """Yields the non-empty dict, list and bucket tree nodes of the subtree of item (incl. item) breadth
+        first. The nodes are found in the document index, leaves are not touched and no Tk calls are made.
+        Compact arrays are only yielded as item, they aren't expanded as part of a subtree.
+
+        Args:
+            item (str): tree node
+            depth (int, optional): Number of levels to be yielded. Defaults to None (all levels).
+            populate (bool, optional): Populates lazy nodes, otherwise they are skipped. Defaults to False.
+        """
+        level = [item]
+        while level and (depth is None or depth > 0):
+            next_level = []
+            for node in level:
+                if node in self.unloaded:
+                    if not populate:
+                        continue
+                    self.populate_tree_node(node)
+                yield node
+                
+                path, items = self.iter_node_items(node)
+                for key, value in items:
+                    if type(key) is range:
+                        child = self.bucket_nodes.get((path, key))
+                    elif type(value) in (dict, list) and value or type(value) is Unparsed and not value.empty:
+                        child = self.doc.paths.get(path + (key, ))
+                    else:
+                        continue
+                    if child:  # None, if not inserted yet
+                        next_level.append(child)
+            level = next_level
+            depth = None if depth is None else depth - 1
+    
+    
+    def reveal_nodes(self, path: tuple) -> list[str]:
+        """Inserts (lazy mode) and opens the ancestors of a JSON path incl. the buckets of long lists, 
+        such that its node can be shown.
+
+        Returns:
+            list[str]: tree nodes from the root to the path, empty if it is not inserted (yet)
+        """
+        nodes = []
+        for n in range(len(path) + 1):
+            node = self.doc.paths.get(path[:n])
+            if node is None:
+                return []
+            nodes.append(node)
+            if n == len(path):
+                return nodes
             
-                     
-    def load_json_file(self) -> None:
-        """Launches a filepicker to select a file, that will be read as json and inserted into the tree.
+            self.populate_tree_node(node)
+            self.tree.item(node, open=True)
+            value = self.doc.get(path[:n])
+            start, stop = 0, len(value)
+            while type(value) in (list, array, MappedList) and (span := bucket_span(start, stop)):
+                start += (path[n] - start) // span * span
+                stop = min(start + span, stop)
+                node = self.bucket_nodes.get((path[:n], range(start, stop)))
+                if node is None:
+                    return []
+                nodes.append(node)
+                self.populate_tree_node(node)
+                self.tree.item(node, open=True)
+    
+    
+    def reveal(self, path: tuple) -> str:
+        """Inserts (lazy mode) and opens the ancestors of a JSON path, see reveal_nodes
+
+        Returns:
+            str: tree node of the path or None, if it is not inserted (yet)
         """
-        fp = filedialog.askopenfilename(initialdir=self.path, filetypes=[("JSON files", "*.json"), ("All Files", "*.*")])
-        if not fp:
+        nodes = self.reveal_nodes(path)
+        return nodes[-1] if nodes else None
+    
+    
+    def iter_node_items(self, node: str) -> tuple:
+        """Returns the JSON path and the items (key, value) of a dict, list, array or bucket tree node. 
+        Buckets of long lists are items (range, None), see iter_list_items.
+        """
+        if node in self.buckets:
+            path, indices = self.buckets[node]
+            return path, iter_list_items(self.doc.get(path), indices.start, indices.stop)
+        
+        path = self.doc.iids[node]
+        value = self.doc.get(path)
+        if type(value) is dict:
+            return path, value.items()
+        if type(value) in (list, array, MappedList):
+            return path, iter_list_items(value, 0, len(value))
+        return path, ()
+    
+    
+    def child_nodes(self, node: str) -> list[str]:
+        """Returns the inserted child nodes in document order (found in the document index)
+        """
+        path, items = self.iter_node_items(node)
+        children = (self.bucket_nodes.get((path, key)) if type(key) is range else self.doc.paths.get(path + (key, ))
+                    for key, _ in items)
+        return [child for child in children if child]
+    
+    
+    def descendant_nodes(self, node: str) -> list[str]:
+        """Returns all inserted nodes below node (found in the document index)
+        """
+        descendants = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node not in self.unloaded:
+                children = self.child_nodes(node)
+                descendants.extend(children)
+                stack.extend(children)
+        return descendants
+    
+    
+    def schedule_search(self) -> None:
+        """Runs the search SEARCH_DELAY ms after the last keystroke in the search entry
+        """
+        if self.search_job:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY, self.search)
+        
+        
+    def search(self) -> None:
+        """Searches the search text in the search index and shows the first match. If filter is selected,
+        only the branches with matches are shown.
+        """
+        self.search_job = None
+        self.clear_filter()
+        index = self.doc.search_index
+        self.matches = index.search(self.search_text.get()) if index else []
+        self.match_index = -1
+        if self.search_filter.get() and self.search_text.get().strip():
+            self.filter_tree(self.matches[:MAX_REVEALED])
+        if self.matches:
+            self.jump_to_match(1)
+        else:
+            self.search_info.configure(text="no match" if self.search_text.get().strip() else "")
+        
+        
+    def jump_to_match(self, step: int) -> None:
+        """Selects and shows the next (step=1) or previous (step=-1) search match
+        """
+        if not self.matches:
             return
         
+        self.match_index = (self.match_index + step) % len(self.matches)
+        self.search_info.configure(text=f"{self.match_index + 1}/{len(self.matches)}")
+        node = self.reveal(self.matches[self.match_index])
+        if node:
+            self.tree.selection_set(node)
+            self.tree.focus(node)
+            self.tree.see(node)
+            
+            
+    def filter_tree(self, paths: list[tuple]) -> None:
+        """Shows only the branches of the tree, that lead to the JSON paths (by detaching all others)
+        """
+        shown = set()
+        for path in paths:
+            shown.update(self.reveal_nodes(path))
+        matches = set(self.doc.paths.get(path) for path in paths)
+                
+        root = self.doc.paths.get(())
+        if root is None:
+            return
+        nodes = [root]
+        while nodes:  # filter the children of the shown ancestors of the matches
+            node = nodes.pop()
+            if node in matches or node in self.unloaded:
+                continue
+            children = [child for child in self.child_nodes(node) if child in shown]
+            self.tree.set_children(node, *children)
+            self.filtered.append(node)
+            nodes.extend(children)
+            
+            
+    def clear_filter(self) -> None:
+        """Shows the nodes again, that have been detached by filter_tree
+        """
+        for node in self.filtered:
+            if node in self.doc.iids and node not in self.unloaded:
+                self.tree.set_children(node, *self.child_nodes(node))
+        self.filtered = []
+    
+    
+    def run_query(self) -> None:
+        """Evaluates the query text against the document, highlights the matches and reveals the first 
+        MAX_REVEALED of them. The matches of the last QUERY_RESULTS queries are kept and re-evaluated only 
+        within the branches, that have changed since, see QueryResults.
+        """
+        text = self.query_text.get().strip()
+        if not text:
+            self.clear_query()
+            return
         try:
-            with open(fp, "r") as file:
-                obj = json.load(file)
-        except Exception:
-            messagebox.showwarning(title="Warning", message=f"Could not open '{fp}'!")
+            query = compile_query(text)
+        except ValueError as e:
+            self.query_info.configure(text=str(e))
             return
-                
+        
+        results = self.query_results.pop(text, None)
+        if results is None:
+            results = QueryResults(query, self.doc)
+        self.query_results[text] = results
+        if len(self.query_results) > QUERY_RESULTS:
+            self.query_results.popitem(last=False)[1].close()
+        
+        self.query = text
+        self.show_query_matches(results.update())
+        for path in self.query_matches[:MAX_REVEALED]:
+            self.reveal_nodes(path)
+        self.query_index = -1
+        if self.query_matches:
+            self.jump_to_query_match(1)
+        else:
+            self.query_info.configure(text="no match")
+            
+            
+    def jump_to_query_match(self, step: int) -> None:
+        """Selects and shows the next (step=1) or previous (step=-1) query match
+        """
+        if not self.query_matches:
+            return
+        
+        self.query_index = (self.query_index + step) % len(self.query_matches)
+        self.query_info.configure(text=f"{self.query_index + 1}/{len(self.query_matches)}")
+        node = self.reveal(self.query_matches[self.query_index])
+        if node:
+            self.tree.selection_set(node)
+            self.tree.focus(node)
+            self.tree.see(node)
+            
+            
+    def show_query_matches(self, paths: list[tuple]) -> None:
+        """Highlights the nodes of the query matches (the inserted nodes at once, the others when they are 
+        inserted) and removes the highlight of the previous matches
+        """
+        previous = self.query_match_set
+        self.query_matches, self.query_match_set = paths, set(paths)
+        self.retag_nodes(previous ^ self.query_match_set)
+        
+        
+    def clear_query(self) -> None:
+        self.show_query_matches([])
+        self.query = None
+        self.query_index = -1
+        self.query_info.configure(text="")
+        
+        
+    def reset_queries(self) -> None:
+        """Drops the query results of a replaced document and the highlights of its matches
+        """
+        for results in self.query_results.values():
+            results.close()
+        self.query_results.clear()
+        self.query_matches, self.query_match_set = [], set()
+        self.query = None
+        self.query_index = -1
+        self.query_info.configure(text="")
+    
+    
+    def expand_tree(self, expand: bool = True, depth: int = None, item: str = None) -> None:
+        """Expands or collapses the tree. In lazy mode, collapsing drops the inserted nodes and expanding 
+        populates the nodes, if a depth or an item is given. Otherwise only populated nodes are expanded.
+
+        Args:
+            expand (bool, optional): Expands if True, collapses if False. Defaults to True.
+            depth (int, optional): Number of levels to be expanded. Defaults to None (all levels).
+            item (str, optional): Tree node, whose subtree is expanded or collapsed. Defaults to None (root).
+        """
+        if item is None:
+            item = self.doc.paths.get(())
+        if not item or (item not in self.doc.iids and item not in self.buckets):  # no document or a placeholder
+            return
+        
+        if not expand and self.is_lazy():
+            self.unload_tree_node(item)
+            self.tree.item(item, open=False)  # the descendants are dropped, there is nothing else to collapse
+            return
+
+        populate = depth is not None or item != self.doc.paths[()]
+        with self.instruments.phase("expand" if expand else "collapse", nodes=0) as phase:
+            for node in self.iter_container_nodes(item, depth, populate):
+                self.tree.item(node, open=expand)
+                phase["nodes"] += 1
+            
+                     
+    def run_task(self, func, *args, on_done=None, error_message: str = "", phase: str = None) -> None:
+        """Runs func(*args) in a BackgroundTask, showing its progress in the progress bar.
+
+        Args:
+            func (callable): Function to be run on the worker thread, see BackgroundTask
+            on_done (callable, optional): Called with the result in the main loop. Defaults to None.
+            error_message (str, optional): Warning shown, if func raises an exception. Defaults to "".
+            phase (str, optional): Name of the phase, that the task is timed as, see Instrumentation. 
+                Defaults to None (not timed).
+        """
+        self.task_phase = self.instruments.start(phase) if phase else None
+        self.task = BackgroundTask(func, *args)
+        self.task_done = on_done
+        self.task_error_message = error_message
+        self.progress["value"] = 0
+        self.task.start()
+        self.poll_job = self.after(POLL_INTERVAL, self.poll_task)
+        
+        
+    def poll_task(self) -> None:
+        """Handles the messages of the BackgroundTask and polls again until the task is finished
+        """
+        for message, value in self.task.messages():
+            if message == "progress":
+                self.progress["value"] = value
+                continue
+            
+            task, self.task = self.task, None
+            self.poll_job = None
+            self.progress["value"] = 0
+            if self.task_phase:
+                self.instruments.stop(self.task_phase, error=message != "done" or task.cancelled.is_set())
+                self.task_phase = None
+            if message == "error":
+                from tkinter import messagebox  # imported on first use, like filedialog, for a fast startup
+                messagebox.showwarning(title="Warning", message=self.task_error_message)
+            elif message == "done" and not task.cancelled.is_set() and self.task_done:
+                self.task_done(value)
+            return
+        
+        self.poll_job = self.after(POLL_INTERVAL, self.poll_task)
+        
+        
+    def cancel_task(self) -> None:
+        """Cancels loading or saving. The tree and the file on disk are left unchanged. A document, that is
+        still being inserted into the tree, is removed.
+        """
+        if self.task:
+            self.task.cancel()
+        elif self.insertion:
+            self.detach_document()
+            self.delete_tree_nodes()
+            self.doc = JSONDocument()
+            self.history = EditHistory(self.doc)
+            self.file_path = self.file_version = None  # not watched anymore
+            
+                     
+    def load_json_file(self) -> None:
+        """Launches a filepicker to select a file, that will be read as json in the background and inserted
+        into the tree. Several selected files are parsed in parallel and shown as one document.
+        """
+        self.close_cell_popup()
+        if self.task:
+            return
+        
+        from tkinter import filedialog
+        fps = filedialog.askopenfilenames(initialdir=self.path, filetypes=FILETYPES)
+        if fps:
+            self.open_files(fps)
+        
+        
+    def open_files(self, fps: list, readonly: bool = False) -> None:
+        """Reads the files as json in the background and inserts them into the tree, see load_json_file
+
+        Args:
+            fps (list): file paths, several files are shown as one document
+            readonly (bool, optional): Opens the document read-only. Defaults to False.
+        """
+        def show(doc: JSONDocument, fp: str = None, cache_key: tuple = None) -> None:
+            doc.readonly = doc.readonly or readonly
+            self.show_document(doc, fp, cache_key)
+        
+        fp = fps[0]
+        cacheable = self.cache is not None and len(fps) == 1 and not self.mmap.get() and base_extension(fp) not in JSON_LINES_EXTENSIONS
+        key = document_key(fp) if cacheable else None
+        entry = self.cache.get(key) if key else None
+        if entry and (key == self.cache_key or not self.cache.is_open(key)):  # a document isn't shared by frames
+            entry.doc.readonly = readonly
+            show(entry.doc, fp, key)
+        elif key:
+            self.run_task(load_document, fp, on_done=lambda doc: show(doc, fp, key), error_message=f"Could not open '{fp}'!", 
+                          phase="parse")
+        elif len(fps) > 1:
+            self.run_task(load_documents, list(fps), on_done=show, error_message=f"Could not open '{fp}'...!", phase="parse")
+        elif base_extension(fp) in JSON_LINES_EXTENSIONS:  # only the line index, unless parse lines is checked
+            self.run_task(JSONLinesDocument, fp, self.parse_lines.get(), on_done=lambda doc: show(doc, fp), 
+                          error_message=f"Could not open '{fp}'!", phase="parse")
+        else:
+            load = MappedDocument if self.mmap.get() else load_document
+            self.run_task(load, fp, on_done=lambda doc: show(doc, fp), error_message=f"Could not open '{fp}'!", phase="parse")
+        
+        
+    def show_document(self, doc: JSONDocument, fp: str = None, cache_key: tuple = None) -> None:
+        """Replaces the tree content by the document. The edits of a document, that is loaded from a single 
+        file, are logged (see start_edit_log), after the unsaved edits of a previous session are replayed. A 
+        cached document is shown with the tree records of its first display, a document to be cached is 
+        cached with its records, once they are inserted.
+
+        Args:
+            doc (JSONDocument): document to be shown
+            fp (str, optional): file path of the document. Defaults to None.
+            cache_key (tuple, optional): document_key of the file, if the document is cached (or to be 
+                cached) in the DocumentCache. Defaults to None.
+        """
+        if cache_key:
+            self.cache.open(cache_key)  # before the shown document is released, which may be the same
+        self.detach_document()
+        self.reset_queries()
         self.delete_tree_nodes()
-        self.insert_tree_node(file.name, value=obj)
-        self.expand_tree()
+        self.doc = doc
+        self.cache_key = cache_key
+        self.history = EditHistory(doc)
+        doc.listeners.append(self.on_document_change)
+        doc.clear_index()  # the nodes populated in a closed frame don't exist in this tree
+        replayed = self.replay_edit_log(fp) if fp and not doc.readonly else 0  # before the records are built
+        lazy = self.is_lazy()
+        entry = self.cache.get(cache_key) if cache_key else None
+        if entry and entry.doc is doc and entry.records is not None and entry.lazy == lazy:
+            records = self.iter_cached_records(entry)
+        else:
+            records = self.iter_tree_records(doc.name, doc.obj, levels=1 if lazy else None)
+            if cache_key:
+                records = self.record_insertion(records, entry or self.cache.put(cache_key, doc), lazy)
+        self.insert_records(records, open=not lazy)
+        if lazy:
+            self.tree.item(doc.paths[()], open=True)
         
         # set selection and allow keyboard browsing
-        first = self.tree.get_children()[0]
+        first = doc.paths[()]
         self.tree.selection_set(first)  # move selection
         self.tree.focus(first)  # move focus
         self.tree.see(first)  # scroll to show it
         self.tree.focus_set()
+        self.file_path = fp
+        self.file_version = file_version(fp) if fp else None
+        if fp and not doc.readonly:
+            self.start_edit_log(fp, replayed)
+        self.event_generate("<<DocumentShown>>")
+
+
+    def iter_cached_records(self, entry):
+        """Yields the records of a cached document and registers their nodes, when they are inserted (like
+        iter_records), with the index of the cache entry (see record_insertion)
+
+        Args:
+            entry (CacheEntry): entry of the shown document
+        """
+        for record in entry.records:
+            parent, iid, field, values, tag = record
+            if iid is None:  # placeholder of a lazy node, whose parent is already unloaded
+                yield record
+                continue
+            if tag == "bucket":
+                self.buckets[iid] = entry.buckets[iid]
+                self.bucket_nodes[entry.buckets[iid]] = iid
+            else:
+                self.doc.register(iid, entry.index[iid])
+            if iid in entry.unloaded:
+                self.unloaded.add(iid)
+            yield record
+
+
+    def record_insertion(self, records, entry, lazy: bool):
+        """Yields the records and adds them to the cache entry of the document, once all are inserted, 
+        together with the index of their nodes
+
+        Args:
+            records (generator): records (parent, iid, field, values, tag), see iter_tree_records
+            entry (CacheEntry): entry of the shown document
+            lazy (bool): records of a lazy display
+        """
+        recorded = []
+        for record in records:
+            recorded.append(record)
+            yield record
+        if entry.doc is not self.doc or entry.changed:
+            return
+        index, buckets, unloaded = {}, {}, set()
+        for parent, iid, field, values, tag in recorded:
+            if iid is None:  # placeholder of a lazy node
+                unloaded.add(parent)
+            elif tag == "bucket":
+                buckets[iid] = self.buckets.get(iid)
+            else:
+                index[iid] = self.doc.iids.get(iid)
+        if None in index.values() or None in buckets.values():
+            return  # nodes have been closed (lazy mode) while inserting, the records are outdated
+        self.cache.set_records(entry, recorded, lazy, index, buckets, unloaded)
+
+
+    def detach_document(self) -> None:
+        """Stops following the changes of the shown document, that may be kept by the DocumentCache and 
+        shown again
+        """
+        self.close_edit_log()
+        self.history.close()
+        if self.on_document_change in self.doc.listeners:
+            self.doc.listeners.remove(self.on_document_change)
+        if self.cache_key:
+            self.cache.close(self.cache_key)
+            self.cache_key = None
+
+
+    def close_document(self) -> None:
+        """Releases the document and cancels the pending jobs, before the frame is destroyed
+        """
+        self.close_cell_popup()
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        for job in (self.poll_job, self.insert_job, self.search_job, self.watch_job):
+            if job:
+                self.after_cancel(job)
+        self.poll_job = self.insert_job = self.search_job = self.watch_job = None
+        self.insertion = None
+        self.detach_document()
+        self.reset_queries()
+
+
+    def replay_edit_log(self, fp: str) -> int:
+        """Offers to replay the edits of a previous session, that have not been saved to the file (see 
+        read_log), and returns the number of replayed edits
+        """
+        edits = read_log(fp)
+        from tkinter import messagebox
+        if edits and not messagebox.askyesno(title="Replay", message=f"Replay {len(edits)} unsaved edits of '{fp}'?"):
+            edits = []
+        replay_log(self.doc, edits)
+        return len(edits)
+
+
+    def start_edit_log(self, fp: str, replayed: int = 0) -> None:
+        """Logs the edits of the document, continuing the log of the replayed edits, see replay_edit_log
+        """
+        try:
+            self.edit_log = EditLog(self.doc, fp, replayed=replayed)
+        except OSError:
+            self.edit_log = None  # like in a read-only directory, no autosave
+            
+            
+    def close_edit_log(self) -> None:
+        if self.autosave_job:
+            self.after_cancel(self.autosave_job)
+            self.autosave_job = None
+        if self.edit_log:
+            self.edit_log.close()
+            self.edit_log = None
+
+
+    def schedule_autosave(self) -> None:
+        """Saves the logged edits to the file AUTOSAVE_IDLE ms after the last edit
+        """
+        if not self.edit_log:
+            return
+        if self.autosave_job:
+            self.after_cancel(self.autosave_job)
+        self.autosave_job = self.after(AUTOSAVE_IDLE, self.autosave)
+
+
+    def is_editing(self) -> bool:
+        """Returns True, while a cell popup of the frame or of one of its TableViews is open
+        """
+        return any(popup and popup.winfo_exists() for popup in [self.popup] + [view.popup for view in self.table_views])
+
+
+    def autosave(self) -> None:
+        """Compacts the edit log by saving the document to its file in the background
+        """
+        self.autosave_job = None
+        if not self.edit_log or not self.edit_log.edits:
+            return
+        if self.task or self.is_editing():
+            self.schedule_autosave()  # not idle
+            return
+        fp = self.edit_log.fp
+        self.run_task(save_document, self.doc, fp, self.get_compress_level(), on_done=lambda result: self.on_document_saved(fp), 
+                      error_message=f"Could not autosave '{fp}'!", phase="autosave")
+        
+        
+    def on_document_saved(self, fp: str) -> None:
+        """Resets the edit log, if the document has been saved to its file
+        """
+        if self.edit_log and os.path.samefile(fp, self.edit_log.fp):
+            self.edit_log.reset()
+        if self.file_path and os.path.samefile(fp, self.file_path):
+            self.file_version = file_version(fp)  # not a change to be reloaded
+
+
+    def compare_json_files(self) -> None:
+        """Launches a filepicker to select two files, or one file to be compared with the opened file, and 
+        shows them side by side in a CompareView window
+        """
+        self.close_cell_popup()
+        from tkinter import filedialog
+        fps = filedialog.askopenfilenames(initialdir=self.path, filetypes=FILETYPES, title="Select two files to compare")
+        if len(fps) == 1 and self.file_path:
+            fps = (self.file_path, fps[0])
+        if len(fps) != 2:
+            return
+        
+        window = tk.Toplevel(self)
+        window.title(f"{os.path.basename(fps[0])} - {os.path.basename(fps[1])}")
+        CompareView(window, *fps)
+
+
+    def show_table(self) -> None:
+        """Shows the selected list of dicts with the same keys (or its closest ancestor, that is one) in a 
+        TableView window, see table_keys
+        """
+        self.close_cell_popup()
+        if self.task:
+            return
+        node = self.tree.focus()
+        path = self.buckets[node][0] if node in self.buckets else self.doc.iids.get(node)
+        while path is not None and table_keys(self.doc.get(path)) is None:
+            path = path[:-1] if path else None
+        if path is None:
+            from tkinter import messagebox
+            messagebox.showinfo(title="Table", message="Select a list of dicts with the same keys!")
+            return
+        
+        window = tk.Toplevel(self)
+        window.title(" / ".join(map(str, (self.doc.name, ) + path)))
+        TableView(window, self, path)
+
+
+    def poll_file(self) -> None:
+        """Polls the size and modification time of the document's file every WATCH_INTERVAL ms, while watch
+        is selected. A changed file is reloaded, once it has been unchanged for one interval (written 
+        completely), and the changes are applied to the tree, see apply_file_changes.
+        """
+        if self.watch_job:
+            self.after_cancel(self.watch_job)
+            self.watch_job = None
+        if not self.watch.get():
+            return
+        self.watch_job = self.after(WATCH_INTERVAL, self.poll_file)
+        if self.task or self.insertion or not self.file_path or type(self.doc) is not JSONDocument:
+            return  # memory-mapped, JSON Lines and multi-file documents aren't watched
+        
+        try:
+            version = file_version(self.file_path)
+        except OSError:
+            return  # like while the file is being replaced
+        if version == self.file_version or version != self.changed_version:
+            self.changed_version = version
+            return
+        
+        self.file_version = version
+        self.close_cell_popups()  # no edits while reloading
+        from tkinter import messagebox
+        if self.edit_log and self.edit_log.edits and not messagebox.askyesno(
+                title="Reload", message=f"'{self.file_path}' has changed on disk. Reload it and discard the unsaved edits?"):
+            return
+        self.run_task(reload_document, self.doc, self.file_path, on_done=self.apply_file_changes, 
+                      error_message=f"Could not reload '{self.file_path}'!", phase="reload")
+        
+        
+    def apply_file_changes(self, result: tuple) -> None:
+        """Replaces the document by the reloaded one and applies only the changes to the tree. The open 
+        nodes, the selection and the scroll position are kept.
+
+        Args:
+            result (tuple): the reloaded JSONDocument and the changes, see reload_document
+        """
+        doc, changes = result
+        old = self.doc
+        selected = old.iids.get(self.tree.focus())
+        self.clear_filter()
+        query = self.query
+        self.show_query_matches([])
+        reopen = []  # JSON paths of the open nodes within replaced subtrees
+        positions = {}  # JSON path of a dict -> {key: position} in the reloaded document
+        for action, path, value in self.merge_list_changes(changes, doc):
+            node = old.paths.get(path)
+            if action == "insert":
+                parent = old.paths.get(path[:-1])
+                if parent is None or parent in self.unloaded:
+                    continue  # inserted from the reloaded document, when the parent is opened
+                if type(path[-1]) is str:
+                    if path[:-1] not in positions:
+                        positions[path[:-1]] = {key: i for i, key in enumerate(doc.get(path[:-1]))}
+                    index = positions[path[:-1]][path[-1]]
+                else:
+                    index = tk.END
+                self.insert_tree_item(parent, path[:-1], path[-1], value, index)
+            elif node is None:
+                continue  # not inserted (lazy mode)
+            elif action == "delete":
+                self.delete_tree_node(node)
+            elif type(value) in (dict, list, array) or type(old.get(path)) in (dict, list, array):
+                parent, index = self.tree.parent(node), self.tree.index(node)
+                reopen.extend(old.iids[n] for n in [node] + self.descendant_nodes(node) 
+                              if n in old.iids and self.tree.item(n, "open"))
+                self.delete_tree_node(node)
+                self.insert_tree_item(parent, path[:-1] if path else None, path[-1] if path else old.name, value, index)
+            else:
+                self.tree.item(node, values=[value], tags=self.node_tags(path, value))
+        
+        doc.iids, doc.paths, doc.iid_counter = old.iids, old.paths, old.iid_counter  # the index of the tree
+        doc.name = old.name
+        self.detach_document()  # the cached document (if any) doesn't match the file anymore
+        self.doc = doc
+        self.history = EditHistory(doc)
+        doc.listeners.append(self.on_document_change)
+        self.start_edit_log(self.file_path, self.replay_edit_log(self.file_path))
+        
+        for path in reopen:
+            try:
+                if type(doc.get(path)) not in (dict, list, array):
+                    continue
+            except (KeyError, IndexError, TypeError):
+                continue  # removed by the change
+            nodes = self.reveal_nodes(path)
+            if nodes:
+                self.populate_tree_node(nodes[-1])
+                self.tree.item(nodes[-1], open=True)
+        if selected is not None:
+            node = next(doc.paths[selected[:n]] for n in range(len(selected), -1, -1) if selected[:n] in doc.paths)
+            self.tree.selection_set(node)
+            self.tree.focus(node)
+        if self.search_text.get().strip():
+            self.matches = doc.search_index.search(self.search_text.get())
+            self.match_index = -1
+            if self.search_filter.get():
+                self.filter_tree(self.matches[:MAX_REVEALED])
+            self.search_info.configure(text=f"0/{len(self.matches)}" if self.matches else "no match")
+        if query:
+            self.reset_queries()  # the results belong to the replaced document
+            results = self.query_results[query] = QueryResults(compile_query(query), doc)
+            self.query = query
+            self.show_query_matches(results.paths)
+            self.query_info.configure(text=f"0/{len(self.query_matches)}" if self.query_matches else "no match")
+        
+        
+    def merge_list_changes(self, changes: list[tuple], doc: JSONDocument) -> list[tuple]:
+        """Replaces the inserted and deleted items of long lists, that are split into buckets, by a change 
+        of the whole list, see diff
+
+        Args:
+            changes (list[tuple]): changes (action, path, value) from the document to doc
+            doc (JSONDocument): reloaded document
+        """
+        merged, lists = [], set()
+        for action, path, value in changes:
+            if action != "set" and type(path[-1]) is int:
+                if max(len(self.doc.get(path[:-1])), len(doc.get(path[:-1]))) > BUCKET_SIZE:
+                    if path[:-1] not in lists:
+                        lists.add(path[:-1])
+                        merged.append(("set", path[:-1], doc.get(path[:-1])))
+                    continue
+            merged.append((action, path, value))
+        return merged
 
 
     def save_json_file(self):
-        """Launches a filepicker and saves the current tree content as json to that file path.
+        """Launches a filepicker and saves the current document as json to that file path in the background.
+        Files ending with .gz, .xz or .bz2 are compressed at the selected level.
         """
-        fp = filedialog.asksaveasfilename(initialdir=self.path, filetypes=[("JSON files", "*.json"), ("All Files", "*.*")])
+        self.close_cell_popups()  # no edits while saving
+        if self.task:
+            return
+        
+        if self.doc.readonly:
+            from tkinter import messagebox
+            messagebox.showinfo(title="Info", message=f"'{self.doc.name}' is opened read-only!")
+            return
+        
+        from tkinter import filedialog
+        fp = filedialog.asksaveasfilename(initialdir=self.path, filetypes=FILETYPES)
         if not fp:
             return
 
-        obj = self.extract_obj_from_tree()
-        try:
-            with open(fp, "w") as file:
-                json.dump(obj, file)
-        except Exception:
-            messagebox.showwarning(title="Warning", message=f"Could not open '{fp}'!")
+        self.run_task(save_document, self.doc, fp, self.get_compress_level(), on_done=lambda result: self.on_document_saved(fp), 
+                      error_message=f"Could not open '{fp}'!", phase="save")
         
 
-    def insert_tree_node(self, field: str, value: object, node: str = '') -> None:
+    def on_document_change(self, action: str, path: tuple, old: object, new: object) -> None:
+        """Updates the inserted tree rows on document changes, see JSONDocument.listeners. Within 
+        batched_updates, the changes are collected and the rows are updated at the end.
+        """
+        if self.batch is not None:
+            self.batch.append((action, path, old, new))
+            return
+        self.schedule_autosave()
+        self.update_tree_rows([(action, path, old, new)])
+        
+        
+    def update_tree_rows(self, changes: list[tuple]) -> None:
+        """Updates the inserted tree rows of the document changes (action, path, old, new). The summary of
+        a changed compact array is computed once.
+        """
+        arrays = set()
+        for action, path, old, new in changes:
+            if action == "rename":
+                node = self.doc.paths.get(path[:-1] + (new, ) if path else ())
+                if node:
+                    self.tree.item(node, text=new)
+                continue
+            
+            node = self.doc.paths.get(path)
+            if node and type(new) not in (dict, list, array):
+                if type(new) is type(old):
+                    self.tree.item(node, values=[new])
+                else:
+                    self.tree.item(node, values=[new], tags=self.node_tags(path, new))
+            if path and path[:-1] in self.doc.array_paths:
+                arrays.add(path[:-1])
+        for path in arrays:  # update the summary of the array
+            node = self.doc.paths.get(path)
+            if node:
+                self.tree.item(node, values=[array_summary(self.doc.get(path))])
+        
+
+    def iter_tree_records(self, field: str, value: object, node: str = '', levels: int = None):
+        """Flattens a tree node (consisting of field name and value) and its children into records 
+        (parent, iid, field, values, tag) for Treeview.insert. The records are generated depth first, hence
+        a parent is always inserted before its children. The nodes are registered with their JSON path in 
+        the document index.
+
+        Args:
+            field (str): field name in the tree
+            value (JSON-able object): Value in the tree
+            node (str, optional): Parent tree node. Defaults to '' (root).
+            levels (int, optional): Number of child levels to be inserted below the node. The children
+                of deeper dicts and lists are represented by a placeholder and inserted when the node is
+                opened (lazy mode). Defaults to None (insert all levels).
+        """
+        parent_path = self.doc.iids[node] if node else None
+        return self.iter_records(node, parent_path, [(field, value)], levels)
+    
+    
+    def iter_records(self, parent: str, parent_path: tuple, items, levels: int = None):
+        """Flattens the items (key, value) of the parent node into records, see iter_tree_records.
+        Lists with more than BUCKET_SIZE items are split into buckets, that are always inserted lazily.
+        Compact arrays are shown as a single row with a summary, their items are always inserted lazily. 
+        So are the Unparsed containers of memory-mapped documents.
+
+        Args:
+            parent (str): Parent tree node
+            parent_path (tuple): JSON path of the parent, None for the root
+            items (iterable): items (key, value), with range keys for buckets, see iter_list_items
+            levels (int, optional): Number of child levels to be inserted, see iter_tree_records. 
+        """
+        stack = [(parent, parent_path, levels, iter(items))]
+        while stack:
+            parent, parent_path, levels, items = stack[-1]
+            item = next(items, None)
+            if item is None:
+                stack.pop()
+                continue
+            
+            key, value = item
+            iid = self.doc.new_iid()
+            if type(key) is range:  # bucket of a long list
+                self.buckets[iid] = (parent_path, key)
+                self.bucket_nodes[(parent_path, key)] = iid
+                self.unloaded.add(iid)
+                yield parent, iid, f"[{key.start}...{key.stop - 1}]", "", "bucket"
+                yield iid, None, "...", "", "placeholder"
+                continue
+            
+            path = () if parent_path is None else parent_path + (key, )
+            self.doc.register(iid, path)
+            if type(value) is array:
+                self.unloaded.add(iid)
+                yield parent, iid, key, [array_summary(value)], self.node_tags(path, value)
+                yield iid, None, "...", "", "placeholder"
+            elif type(value) is Unparsed:
+                yield parent, iid, key, "", self.node_tags(path, value)
+                if not value.empty:
+                    self.unloaded.add(iid)
+                    yield iid, None, "...", "", "placeholder"
+            elif type(value) in (dict, list, MappedList):
+                yield parent, iid, key, "", self.node_tags(path, value)
+                if levels is not None and levels <= 0 and len(value):
+                    self.unloaded.add(iid)
+                    yield iid, None, "...", "", "placeholder"
+                else:
+                    children = value.items() if type(value) is dict else iter_list_items(value, 0, len(value))
+                    stack.append((iid, path, None if levels is None else levels - 1, iter(children)))
+            else:
+                yield parent, iid, key, [value], self.node_tags(path, value)
+    
+    
+    def node_tags(self, path: tuple, value: object) -> object:
+        """Returns the Treeview tags of a node: its type tag, the highlight of the path and the "match" tag 
+        of a query match, if any
+        """
+        highlight = self.highlights.get(path)
+        tags = (highlight, ) if highlight else ()
+        if path in self.query_match_set:
+            tags += ("match", )
+        return (type_tag(value), ) + tags if tags else type_tag(value)
+    
+    
+    def set_highlights(self, highlights: dict) -> None:
+        """Highlights the nodes of the JSON paths with the tag of the path, like the differences of a 
+        CompareView. The inserted nodes are tagged at once, the others when they are inserted.
+
+        Args:
+            highlights (dict): JSON path -> tag
+        """
+        previous, self.highlights = self.highlights, highlights
+        self.retag_nodes(set(previous) | set(highlights))
+        
+        
+    def retag_nodes(self, paths) -> None:
+        """Updates the tags of the inserted nodes of the JSON paths, see node_tags
+        """
+        for path in paths:
+            node = self.doc.paths.get(path)
+            if node:
+                self.tree.item(node, tags=self.node_tags(path, self.doc.get(path)))
+    
+    
+    def insert_tree_node(self, field: str, value: object, node: str = '', levels: int = None) -> None:
         """Inserts a tree node (consisting of field name and value) at the node (tree position).
         If value is a (JSON-able) tree object (incl. lists and dicts) it will be inserted hierarchically.
 
         Args:
             field (str): field name in the tree
             value (JSON-able object): Value in the tree
-            node (str, optional): _description_. Defaults to ''.
+            node (str, optional): Parent tree node. Defaults to '' (root).
+            levels (int, optional): Number of child levels to be inserted, see iter_tree_records. 
+                Defaults to None (insert all levels).
         """
-        type_tag = str(type(value)).split("'")[1]
-        if type(value) is dict:
-            node = self.tree.insert(node, tk.END, text=field, tags=type_tag)
-            for key, val in value.items():
-                self.insert_tree_node(key, val, node)
-                
-        elif type(value) is list:
-            node = self.tree.insert(node, tk.END, text=field, tags=type_tag)
-            for i, val in enumerate(value):
-                self.insert_tree_node(i, val, node)
+        with self.instruments.phase("insert", nodes=0) as phase:
+            for parent, iid, field, values, tag in self.iter_tree_records(field, value, node, levels):
+                self.tree.insert(parent, tk.END, iid=iid, text=field, values=values, tags=tag)
+                phase["nodes"] += 1
+            
+            
+    def insert_records(self, records, open: bool = False) -> None:
+        """Inserts the records (see iter_tree_records) into the tree in batches of insert_batch_size records
+        or insert_time_budget seconds. The remaining records are inserted in the next after_idle tick, such 
+        that the tree shows up progressively and the GUI stays responsive.
 
-        else:
-            self.tree.insert(node, tk.END, text=field, values=[value], tags=type_tag)        
+        Args:
+            records (generator): records (parent, iid, field, values, tag)
+            open (bool, optional): Inserts the nodes opened. Defaults to False.
+        """
+        if records is not self.insertion:  # a new insertion
+            self.insert_phase = self.instruments.start("insert", nodes=0)
+        self.insertion = records
+        deadline = time.perf_counter() + self.insert_time_budget
+        n = 0
+        for n, (parent, iid, field, values, tag) in enumerate(records, start=1):
+            self.tree.insert(parent, tk.END, iid=iid, text=field, values=values, tags=tag, open=open)
+            if n >= self.insert_batch_size or time.perf_counter() > deadline:
+                self.insert_phase["nodes"] += n
+                self.insert_job = self.after_idle(self.continue_insertion, records, open)
+                return
+        self.insertion = None
+        self.insert_phase["nodes"] += n
+        self.instruments.stop(self.insert_phase)  # the time includes the redraws between the batches
+        self.insert_phase = None
+        
+        
+    def continue_insertion(self, records, open: bool) -> None:
+        self.insert_job = None
+        if records is self.insertion:  # not cancelled or replaced by another document
+            self.insert_records(records, open)
+        
+        
+    def insert_tree_item(self, parent: str, parent_path: tuple, key: object, value: object, index: object) -> None:
+        """Inserts an item (key, value) of the parent node and its children (one level in lazy mode) at the 
+        index of the parent's children, see iter_records
+        """
+        records = self.iter_records(parent, parent_path, [(key, value)], levels=0 if self.is_lazy() else None)
+        for n, (parent, iid, field, values, tag) in enumerate(records):
+            self.tree.insert(parent, index if n == 0 else tk.END, iid=iid, text=field, values=values, tags=tag)
+        
+        
+    def populate_tree_node(self, node: str) -> None:
+        """Replaces the placeholder of a lazy tree node by its children (one level)
+        """
+        if node not in self.unloaded:
+            return
+        
+        self.unloaded.discard(node)
+        self.tree.delete(*self.tree.get_children(node))
+        path, items = self.iter_node_items(node)
+        for parent, iid, field, values, tag in self.iter_records(node, path, items, levels=0):
+            self.tree.insert(parent, tk.END, iid=iid, text=field, values=values, tags=tag)
+    
+    
+    def on_tree_open(self, event: tk.Event) -> None:
+        self.populate_tree_node(self.tree.focus())  # the opened node has the focus
+        
+        
+    def is_lazy(self) -> bool:
+        """Returns True in lazy mode and for memory-mapped documents (incl. JSON Lines), that are always shown
+        lazily
+        """
+        return self.lazy.get() or type(self.doc) in (MappedDocument, JSONLinesDocument)
+    
+    
+    def on_tree_close(self, event: tk.Event) -> None:
+        """Drops the children of a closed node in lazy mode, such that only visible nodes occupy the tree
+        """
+        if self.is_lazy():
+            self.unload_tree_node(self.tree.focus())  # the closed node has the focus
+        
+        
+    def unload_tree_node(self, node: str) -> None:
+        """Replaces the children of a tree node by a placeholder (reverse of populate_tree_node)
+        """
+        if node in self.unloaded:
+            return
+        children = self.child_nodes(node)
+        if not children:
+            return
+        
+        self.forget_nodes(self.descendant_nodes(node))
+        self.tree.delete(*children)
+        self.unloaded.add(node)
+        self.tree.insert(node, tk.END, text="...", tags="placeholder")
+        
+        
+    def delete_tree_node(self, node: str) -> None:
+        """Deletes a tree node and its children from the tree and the document index
+        """
+        self.forget_nodes([node] + self.descendant_nodes(node))
+        self.tree.delete(node)
+        
+        
+    def forget_nodes(self, nodes: list[str]) -> None:
+        for node in nodes:
+            self.doc.forget(node)
+            self.unloaded.discard(node)
+            if node in self.buckets:
+                del self.bucket_nodes[self.buckets.pop(node)]
         
         
     def delete_tree_nodes(self):
+        self.insertion = None
+        self.insert_phase = None  # a cancelled insertion isn't reported
+        self.filtered = []
+        self.matches = []
         for child in self.tree.get_children():
             self.tree.delete(child)
+        self.doc.clear_index()
+        self.unloaded.clear()
+        self.buckets.clear()
+        self.bucket_nodes.clear()
 
 
-    def extract_obj_from_tree(self, node: str = "I001") -> object:
-        """Extracts the (JSON-able) Python object from the tree (Tkinter TreeView)
+    def extract_obj_from_tree(self, node: str = None) -> object:
+        """Extracts the (JSON-able) Python object of a tree node from the document model (without querying
+        the Tkinter TreeView). Compact arrays are returned as lists.
 
         Args:
-            node (str, optional): TreeView node reference. Defaults to "I001" (root).
+            node (str, optional): TreeView node reference. Defaults to None (root).
 
         Returns:
-            object: Python object extracted from the treeview
+            object: Python object of the tree node
         """
-        if not self.tree.exists(node) or self.tree.tag_has("NoneType", node):
-            return None
+        with self.instruments.phase("extract"):
+            return self.doc.plain() if node is None else self.doc.plain(self.doc.iids[node])
+
+
+
+class TableView(ttk.Frame):
+    def __init__(self, master, frame: JSONTreeFrame, path: tuple):
+        """Table of a list of dicts with the same keys in the document of a JSONTreeFrame: the keys are the 
+        columns, the dicts the rows. The values are stored column-wise (see ColumnTable), such that sorting 
+        (click on a heading) and filtering by a column don't walk the rows. Cells are edited like in the 
+        tree and change the same document.
+
+        Args:
+            master (tk.Widget): parent widget
+            frame (JSONTreeFrame): frame of the document
+            path (tuple): JSON path of the list, see table_keys
+        """
+        super().__init__(master)
+        self.pack(fill=tk.BOTH, expand=True)
+        self.doc = frame.doc
+        self.frame = frame  # its combo_choice and task are read on each edit
+        self.table = ColumnTable(self.doc, path)
         
-        if self.tree.tag_has("dict", node):
-            obj = {}
-            for child in self.tree.get_children(node):
-                obj[self.tree.item(child)["text"]] = self.extract_obj_from_tree(child)
-            return obj
-                
-        if self.tree.tag_has("list", node):
-            return [self.extract_obj_from_tree(child) for child in self.tree.get_children(node)]
-                
-        obj = self.tree.item(node)['values'][0]
-        try:
-            if self.tree.tag_has("int", node):
-                return int(obj)            
-            if self.tree.tag_has("float", node):
-                return float(obj)
-            if self.tree.tag_has("bool", node):
-                return obj == "True"
-        except ValueError:
-            return obj        
+        control_frame = ttk.Frame(self)
+        control_frame.pack(fill=tk.X)
+        ttk.Label(control_frame, text="filter").pack(side=tk.LEFT)
+        self.filter_key = tk.StringVar(self, value=self.table.keys[0])  # column of the filter condition
+        ttk.Combobox(control_frame, textvariable=self.filter_key, values=self.table.keys, state="readonly", width=12).pack(side=tk.LEFT)
+        self.condition = tk.StringVar(self)  # like "> 0.5" or "== PRBS31", see parse_condition
+        condition_entry = ttk.Entry(control_frame, textvariable=self.condition)
+        condition_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        condition_entry.bind("<Return>", lambda event: self.refresh())
+        ttk.Button(control_frame, text="filter", command=self.refresh).pack(side=tk.LEFT)
+        ttk.Button(control_frame, text="clear", command=lambda: (self.condition.set(""), self.refresh())).pack(side=tk.LEFT)
+        self.info = ttk.Label(control_frame, width=24)  # like "1000 of 4711 rows"
+        self.info.pack(side=tk.LEFT)
+        
+        tree_frame = ttk.Frame(self)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        tree_frame.rowconfigure(0, weight=1)
+        tree_frame.columnconfigure(0, weight=1)
+        self.tree = ttk.Treeview(tree_frame, selectmode="browse", columns=self.table.keys)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.tree.heading("#0", text="#")
+        self.tree.column("#0", width=60, stretch=False)
+        for key in self.table.keys:
+            self.tree.heading(key, text=key, command=lambda key=key: self.sort_by(key))
+        ysb = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscroll=ysb.set)
+        ysb.grid(row=0, column=1, sticky="ns")
+        self.tree.bind("<Button-1>", lambda event: self.close_cell_popup())
+        self.tree.bind("<Double-1>", lambda event: self.make_popup(self.tree.identify_row(event.y), self.tree.identify_column(event.x)))
+        self.bind("<Destroy>", lambda event: self.close() if event.widget is self else None)
+        frame.table_views.append(self)
+        
+        self.popup = None        # Popup widget for cell editing
+        self.sort_key = None     # column, that the rows are sorted by
+        self.descending = False
+        self.refresh_job = None  # after_idle() job of rebuilding a stale table
+        self.doc.listeners.append(self.on_document_change)
+        self.refresh()
+        
+        
+    def sort_by(self, key: str) -> None:
+        """Sorts the rows by the column, a second click on the same heading reverses the order
+        """
+        self.descending = not self.descending if key == self.sort_key else False
+        self.sort_key = key
+        for k in self.table.keys:
+            self.tree.heading(k, text=k + (" \u25bc" if self.descending else " \u25b2") * (k == key))
+        self.refresh()
+        
+        
+    def refresh(self) -> None:
+        """Shows the first TABLE_ROWS rows of the table in the sort order, that pass the filter condition
+        """
+        self.close_cell_popup()
+        self.refresh_job = None
+        if self.table.stale:
+            self.table.close()
+            try:
+                self.table = ColumnTable(self.doc, self.table.path)
+                self.doc.listeners.remove(self.on_document_change)
+                self.doc.listeners.append(self.on_document_change)  # called after the table's listener
+            except (KeyError, IndexError, TypeError, ValueError):
+                self.tree.delete(*self.tree.get_children())
+                self.info.configure(text="no table anymore")
+                return
+        
+        rows = self.table.sort(self.sort_key, self.descending) if self.sort_key in self.table.columns else range(len(self.table))
+        if self.condition.get().strip():
+            try:
+                condition = parse_condition(self.condition.get())
+            except ValueError as e:
+                self.info.configure(text=str(e))
+                return
+            if self.filter_key.get() in self.table.columns:
+                rows = self.table.filter(rows, self.filter_key.get(), condition)
+        
+        self.tree.delete(*self.tree.get_children())
+        for row in rows[:TABLE_ROWS]:
+            row = int(row)
+            self.tree.insert("", tk.END, iid=str(row), text=row, values=[self.cell_text(row, key) for key in self.table.keys])
+        self.info.configure(text=f"{min(len(rows), TABLE_ROWS)} of {len(rows)} rows")
         
-        return obj  # that covers the regular 'str' type
+        
+    def cell_text(self, row: int, key: str) -> object:
+        value = self.table.value(row, key)
+        if type(value) is dict:
+            return f"{{{len(value)} items}}"
+        if type(value) in (list, array):
+            return f"[{len(value)} items]"
+        return value
+    
+    
+    def on_document_change(self, action: str, path: tuple, old: object, new: object) -> None:
+        """Updates a changed cell, a stale table (see ColumnTable.on_change) is rebuilt when idle
+        """
+        if self.table.stale:
+            if not self.refresh_job:
+                self.refresh_job = self.after_idle(self.refresh)
+            return
+        n = len(self.table.path)
+        if action == "set" and len(path) == n + 2 and path[:n] == self.table.path and self.tree.exists(str(path[n])):
+            self.tree.set(str(path[n]), path[-1], self.cell_text(path[n], path[-1]))
+            
+            
+    def close_cell_popup(self) -> None:
+        if self.popup and self.popup.winfo_exists():
+            self.popup.update()
+        self.popup = None
+        
+        
+    def make_popup(self, rowid: str, column: str) -> None:
+        """Opens the edit popup of a cell like JSONTreeFrame.make_popup
+        """
+        self.close_cell_popup()
+        if not rowid or column == "#0" or self.doc.readonly or self.table.stale or self.frame.task:
+            return  # no edits while the document is saved in the background
+        path = self.table.path + (int(rowid), self.table.keys[int(column[1:]) - 1])
+        value = self.doc.get(path)
+        if value is None or type(value) in (dict, list, array):
+            return
+        self.popup = open_popup(self.tree, self.doc, path, rowid, column, value, lambda: self.frame.combo_choice)
+        
+        
+    def close(self) -> None:
+        """Stops following the document changes, when the view is destroyed
+        """
+        self.table.close()
+        if self.on_document_change in self.doc.listeners:
+            self.doc.listeners.remove(self.on_document_change)
+        if self in self.frame.table_views:
+            self.frame.table_views.remove(self)
 
 
-if __name__ == '__main__':
+class CompareView(ttk.Frame):
+    def __init__(self, master, left_fp: str, right_fp: str):
+        """Two read-only JSONTreeFrames side by side, that show the differences of two JSON files, like a 
+        result and a reference (see Comparison). The selections of the frames are synchronized.
+
+        Args:
+            master (tk.Widget): parent widget
+            left_fp (str): file path of the left document
+            right_fp (str): file path of the right document
+        """
+        super().__init__(master)
+        self.pack(fill=tk.BOTH, expand=True)
+        control_frame = ttk.Frame(self)
+        control_frame.pack(fill=tk.X)
+        ttk.Label(control_frame, text="match lists by key").pack(side=tk.LEFT)
+        self.key = tk.StringVar(self)  # lists of dicts are matched by the value of this key, see Comparison
+        key_entry = ttk.Entry(control_frame, textvariable=self.key, width=12)
+        key_entry.pack(side=tk.LEFT)
+        key_entry.bind("<Return>", lambda event: self.compare())
+        ttk.Button(control_frame, text="compare", command=self.compare).pack(side=tk.LEFT)
+        ttk.Button(control_frame, text="<", width=2, command=lambda: self.jump_to_difference(-1)).pack(side=tk.LEFT)
+        ttk.Button(control_frame, text=">", width=2, command=lambda: self.jump_to_difference(1)).pack(side=tk.LEFT)
+        self.info = ttk.Label(control_frame, width=20)  # like "3/17 changed"
+        self.info.pack(side=tk.LEFT)
+        
+        frames = ttk.Frame(self)
+        frames.pack(fill=tk.BOTH, expand=True)
+        self.frames = []
+        for side in ("left", "right"):
+            container = ttk.Frame(frames)
+            container.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            frame = JSONTreeFrame(container, lazy=True)
+            for status, color in DIFF_COLORS.items():
+                frame.tree.tag_configure(status, background=color)
+            frame.tree.bind("<<TreeviewSelect>>", lambda event, side=side: self.sync_selection(side), add="+")
+            self.frames.append(frame)
+        self.left, self.right = self.frames
+        
+        self.comparison = None  # Comparison of the documents of the frames
+        self.index = -1         # index of the shown difference
+        self.selected = {}      # frame -> tree node, that has been selected by this view
+        self.left.run_task(compare_documents, left_fp, right_fp, on_done=self.show_comparison, 
+                           error_message=f"Could not compare '{left_fp}' and '{right_fp}'!")
+        
+        
+    def get_key(self) -> str:
+        return self.key.get().strip() or None
+    
+    
+    def compare(self) -> None:
+        """Compares the shown documents again, like with another key
+        """
+        if self.left.task or not self.comparison:
+            return
+        self.left.run_task(Comparison, self.left.doc.obj, self.right.doc.obj, self.get_key(), on_done=self.show_differences, 
+                           error_message="Could not compare!")
+        
+        
+    def show_comparison(self, result: tuple) -> None:
+        """Shows the documents and their differences, see compare_documents
+        """
+        left_doc, right_doc, comparison = result
+        self.left.show_document(left_doc)
+        self.right.show_document(right_doc)
+        self.show_differences(comparison)
+        if self.get_key():
+            self.compare()
+        
+        
+    def show_differences(self, comparison: Comparison) -> None:
+        self.comparison = comparison
+        self.index = -1
+        self.left.set_highlights(comparison.left_tags)
+        self.right.set_highlights(comparison.right_tags)
+        self.info.configure(text=f"{len(comparison.differences)} differences" if comparison.differences else "identical")
+        
+        
+    def jump_to_difference(self, step: int) -> None:
+        """Selects and shows the next (step=1) or previous (step=-1) difference in both frames
+        """
+        if not self.comparison or not self.comparison.differences:
+            return
+        
+        differences = self.comparison.differences
+        self.index = (self.index + step) % len(differences)
+        status, left_path, right_path = differences[self.index]
+        self.info.configure(text=f"{self.index + 1}/{len(differences)} {status}")
+        self.select(self.left, left_path)
+        self.select(self.right, right_path)
+        
+        
+    def select(self, frame: JSONTreeFrame, path: tuple) -> None:
+        node = frame.reveal(path)
+        if node:
+            frame.tree.selection_set(node)
+            frame.tree.focus(node)
+            frame.tree.see(node)
+            self.selected[frame] = node
+            
+            
+    def sync_selection(self, side: str) -> None:
+        """Selects the counterpart of a node, that has been selected in the frame of side ("left" or 
+        "right"), in the other frame
+        """
+        frame, other = (self.left, self.right) if side == "left" else (self.right, self.left)
+        node = frame.tree.focus()
+        if node == self.selected.get(frame) or node not in frame.doc.iids or not self.comparison:
+            return  # selected by this view
+        if self.comparison.left is not self.left.doc.obj or self.comparison.right is not self.right.doc.obj:
+            return  # another document has been loaded into a frame
+        
+        self.selected[frame] = node
+        self.select(other, self.comparison.counterpart(frame.doc.iids[node], side))
+
+
+class JSONWorkspace(ttk.Frame):
+    def __init__(self, master, lazy: bool = False, cache_size: int = CACHE_SIZE):
+        """Tabs of JSONTreeFrames, one document per tab. The frames share a DocumentCache, so a file, that
+        has been shown before and hasn't changed on disk, is shown again without parsing.
+
+        Args:
+            master (tk.Widget): parent widget
+            lazy (bool, optional): Lazy mode of the frames. Defaults to False.
+            cache_size (int, optional): Memory cap [bytes] of the cached documents. Defaults to CACHE_SIZE.
+        """
+        super().__init__(master)
+        self.pack(fill=tk.BOTH, expand=True)
+        self.lazy = lazy
+        self.cache = DocumentCache(cache_size)
+        
+        control_frame = ttk.Frame(self)
+        control_frame.pack(fill=tk.X)
+        ttk.Button(control_frame, text="open in new tabs", command=self.open_in_tabs).pack(side=tk.LEFT)
+        ttk.Button(control_frame, text="new tab", command=self.new_tab).pack(side=tk.LEFT)
+        ttk.Button(control_frame, text="close tab", command=self.close_tab).pack(side=tk.LEFT)
+        self.cache_info = ttk.Label(control_frame)  # like "cache: 3 files, 120/512 MB"
+        self.cache_info.pack(side=tk.LEFT)
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+        self.notebook.bind("<<NotebookTabChanged>>", lambda event: self.show_cache_info())
+        self.new_tab()
+        
+        
+    def frames(self) -> list[JSONTreeFrame]:
+        return [self.notebook.nametowidget(tab) for tab in self.notebook.tabs()]
+    
+    
+    def current_frame(self) -> JSONTreeFrame:
+        tab = self.notebook.select()
+        return self.notebook.nametowidget(tab) if tab else None
+        
+        
+    def new_tab(self) -> JSONTreeFrame:
+        """Adds and selects a tab with an empty frame
+        """
+        frame = JSONTreeFrame(self.notebook, lazy=self.lazy, cache=self.cache)
+        frame.bind("<<DocumentShown>>", lambda event: self.on_document_shown(frame))
+        self.notebook.add(frame, text="new")
+        self.notebook.select(frame)
+        return frame
+        
+        
+    def open_in_tabs(self) -> None:
+        """Launches a filepicker and opens each selected file in a tab, see open_files
+        """
+        from tkinter import filedialog
+        for fp in filedialog.askopenfilenames(initialdir=os.path.dirname(__file__), filetypes=FILETYPES):
+            self.open_files([fp])
+        
+        
+    def open_files(self, fps: list, readonly: bool = False) -> None:
+        """Opens the files in the current tab, if it is empty, else in a new tab. The tab of a single file, 
+        that is already open, is selected instead (see JSONTreeFrame.open_files for the arguments).
+        """
+        if len(fps) == 1:
+            for frame in self.frames():
+                if frame.file_path and os.path.abspath(frame.file_path) == os.path.abspath(fps[0]):
+                    self.notebook.select(frame)
+                    return
+        frame = self.current_frame()
+        if frame is None or frame.task or frame.doc.obj is not None:
+            frame = self.new_tab()
+        frame.open_files(fps, readonly=readonly)
+        
+        
+    def close_tab(self) -> None:
+        """Closes the current tab. Its document stays in the cache, unless it has been edited.
+        """
+        frame = self.current_frame()
+        if frame is None:
+            return
+        frame.close_document()
+        self.notebook.forget(frame)
+        frame.destroy()
+        if not self.notebook.tabs():
+            self.new_tab()
+        self.show_cache_info()
+        
+        
+    def on_document_shown(self, frame: JSONTreeFrame) -> None:
+        name = os.path.basename(frame.file_path) if frame.file_path else frame.doc.name
+        self.notebook.tab(frame, text=name or "new")
+        self.show_cache_info()
+        
+        
+    def show_cache_info(self) -> None:
+        self.cache_info.configure(text=f"cache: {len(self.cache)} files, {self.cache.size / 2**20:.0f}/{self.cache.max_size / 2**20:.0f} MB")
+
+
+def main(argv: list = None) -> None:
+    """Command line entry point: python Editor2.py [file.json ...] [--lazy] [--readonly] [--cache-size MB]
+
+    The window (a JSONWorkspace) is drawn first, then the files are parsed in the background, so the time to
+    the first frame doesn't depend on the file size. It is shown as "first frame" phase in the status bar.
+    """
+    started = time.perf_counter()
+    import argparse  # only needed here
+    parser = argparse.ArgumentParser(description="Tkinter JSON Editor2")
+    parser.add_argument("files", nargs="*", help="JSON or JSON Lines files, several files are shown as one document")
+    parser.add_argument("--lazy", action="store_true", help="tree nodes are only populated when opened")
+    parser.add_argument("--readonly", action="store_true", help="opens the files read-only")
+    parser.add_argument("--cache-size", type=float, default=CACHE_SIZE / 2**20, help="memory cap [MB] of the parsed documents, that are cached")
+    parser.add_argument("--first-frame", action="store_true", help="exits after the first frame (to measure the startup)")
+    args = parser.parse_args(argv)
+    
+    if os.environ.get("JSON_EDITOR_LOG"):  # file of the structured log of the phases
+        logging.basicConfig(filename=os.environ["JSON_EDITOR_LOG"], level=logging.INFO, format="%(message)s")
     app = tk.Tk()
     app.title('Tkinter JSON Editor2')
     app.geometry("500x300-10+30")
-    JSONTreeFrame(app)
-    app.mainloop()
\ No newline at end of file
+    workspace = JSONWorkspace(app, lazy=args.lazy, cache_size=int(args.cache_size * 2**20))
+    app.update()  # draws the first frame
+    workspace.current_frame().instruments.stop({"phase": "first frame", "start": started, "tcl_calls": 0})  # Tcl calls since the tree was created
+    if args.first_frame:
+        app.destroy()
+        return
+    if args.files:
+        workspace.open_files(args.files, readonly=args.readonly)
+    with profile_session(os.environ.get("JSON_EDITOR_PROFILE")):  # file of the cProfile stats, opt-in
+        app.mainloop()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Background tasks for the JSON editor
+
+Long running work, like parsing and serializing large JSON files, runs on a worker thread, such that the
+Tkinter main loop keeps responding. The worker never touches Tkinter, it reports progress and its result
+through a queue, that is polled from the main loop with after().
+"""
+import queue, threading
+
+
+class TaskCancelled(Exception):
+    """Raised within the worker thread by BackgroundTask.progress, if the task has been cancelled
+    """
+
+
+class BackgroundTask(threading.Thread):
+    def __init__(self, func, *args):
+        """Runs func(*args, progress=self.progress) on a worker thread.
+
+        Args:
+            func (callable): Function to be run, it should call its progress argument regularly.
+            args: Positional arguments of func
+        """
+        super().__init__(daemon=True)
+        self.func = func
+        self.args = args
+        self.queue = queue.Queue()  # messages like ("progress", 0.5), ("done", result) or ("error", exception)
+        self.cancelled = threading.Event()
+
+
+    def run(self):
+        try:
+            result = self.func(*self.args, progress=self.progress)
+        except TaskCancelled:
+            self.queue.put(("cancelled", None))
+        except Exception as e:
+            self.queue.put(("error", e))
+        else:
+            self.queue.put(("done", result))
+
+
+    def progress(self, fraction: float) -> None:
+        """Reports the progress (0..1) from within the worker thread and aborts the task if cancelled
+        """
+        if self.cancelled.is_set():
+            raise TaskCancelled()
+        self.queue.put(("progress", fraction))
+
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+
+    def messages(self):
+        """Yields the messages, that are currently queued (to be called from the main thread)
+        """
+        while True:
+            try:
+                yield self.queue.get_nowait()
+            except queue.Empty:
+                return
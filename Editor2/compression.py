@@ -0,0 +1,54 @@
+"""
+Compressed JSON files for the JSON editor
+
+Files ending with .gz, .xz or .bz2 are decompressed and compressed transparently with gzip, lzma or bz2.
+They are streamed in chunks, such that the compressed bytes are never held in memory completely.
+"""
+import bz2, gzip, lzma, os
+
+
+COMPRESSIONS = {".gz": gzip, ".xz": lzma, ".bz2": bz2}  # file extension -> compression module
+DEFAULT_LEVEL = 6  # compression level 1 (fast) .. 9 (small)
+
+
+def compression(fp: str):
+    """Returns the compression module (gzip, lzma or bz2) of a file path, None if it isn't compressed
+    """
+    return COMPRESSIONS.get(os.path.splitext(fp)[1].lower())
+
+
+def base_extension(fp: str) -> str:
+    """Returns the extension of a file path without a compression extension, like ".jsonl" for "a.jsonl.gz"
+    """
+    if compression(fp):
+        fp = os.path.splitext(fp)[0]
+    return os.path.splitext(fp)[1].lower()
+
+
+def iter_read(fp: str, chunk_size: int):
+    """Yields the (decompressed) chunks of a file as (bytes, progress) with the progress (0..1) along the
+    (compressed) file
+    """
+    size = os.path.getsize(fp) or 1
+    module = compression(fp)
+    with open(fp, "rb") as raw:
+        with module.open(raw, "rb") if module else raw as file:
+            while chunk := file.read(chunk_size):
+                yield chunk, raw.tell() / size
+
+
+def open_write(fp: str, module, mode: str, compresslevel: int = DEFAULT_LEVEL, **kwargs):
+    """Opens a file for writing, compressed by the compression module (or None) at compresslevel (1..9)
+
+    Args:
+        fp (str): file path
+        module (module): gzip, lzma, bz2 or None, see compression
+        mode (str): "wt" or "wb"
+        compresslevel (int, optional): Compression level. Defaults to DEFAULT_LEVEL.
+        kwargs: encoding, errors and newline for mode "wt"
+    """
+    if module is None:
+        return open(fp, mode, **kwargs)
+    if module is lzma:
+        return lzma.open(fp, mode, preset=compresslevel, **kwargs)
+    return module.open(fp, mode, compresslevel=compresslevel, **kwargs)
@@ -0,0 +1,110 @@
+"""
+Bulk edit of the JSON editor
+
+A bulk edit sets many values of a JSONDocument in one operation, like all query or search matches. The
+edit is either a value, that is converted to the type of each old value like in the cell popup, or an
+expression of the old number x marked by a leading "=", like "=x*1.05" or "=round(x / 2)" (a value
+starting with "=" is entered as "=="). An expression is checked and compiled once, such that it costs
+about a function call per value.
+"""
+import ast
+from array import array
+
+from json_query import is_number
+from json_scan import MappedList, Unparsed
+
+
+FUNCTIONS = {"abs": abs, "round": round, "min": min, "max": max}  # functions allowed in an expression
+NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+         ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.UAdd, ast.USub)
+
+
+def convert(text: str, old: object) -> object:
+    """Converts the text to the type of the old value, like EntryPopup and CheckPopup
+
+    Raises:
+        ValueError: the text can't be converted
+    """
+    if type(old) is bool:
+        if text.strip().lower() not in ("true", "false"):
+            raise ValueError(f"'{text}' is no bool")
+        return text.strip().lower() == "true"
+    if type(old) is int:
+        return int(text)
+    if type(old) is float:
+        return float(text)
+    return text
+
+
+def compile_edit(text: str):
+    """Compiles the text of a bulk edit, see the module docstring
+
+    Args:
+        text (str): value like "PRBS31" or expression of x like "=x*1.05"
+
+    Raises:
+        ValueError: the expression has a syntax error or uses other operations than arithmetic (without
+            powers, which could take forever), numbers, x and FUNCTIONS
+
+    Returns:
+        callable: returns the new value for an old value, raises ValueError or TypeError, if the edit
+            doesn't apply to the old value
+    """
+    if text.startswith("=="):
+        return lambda old: convert(text[1:], old)  # a value starting with "="
+    if not text.startswith("="):
+        return lambda old: convert(text, old)  # a value
+
+    try:
+        tree = ast.parse(text[1:].strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Syntax error in '{text[1:].strip()}'") from e
+    
+    for node in ast.walk(tree):
+        if not isinstance(node, NODES) or type(node) is ast.Constant and not is_number(node.value):
+            raise ValueError(f"'{ast.unparse(node) or type(node).__name__}' isn't allowed in an expression")
+        if type(node) is ast.Name and node.id != "x" and node.id not in FUNCTIONS:
+            raise ValueError(f"Unknown name '{node.id}'")
+        if type(node) is ast.Call and (type(node.func) is not ast.Name or node.keywords):
+            raise ValueError(f"'{ast.unparse(node)}' isn't allowed in an expression")
+    code = compile(tree, "<bulk edit>", "eval")
+
+    def evaluate(old: object) -> object:
+        if not is_number(old):
+            raise TypeError("An expression applies only to numbers")
+        return eval(code, {"__builtins__": {}}, dict(FUNCTIONS, x=old))
+    return evaluate
+
+
+def bulk_set(doc, paths: list[tuple], edit, choices: dict = None) -> int:
+    """Sets the values at the JSON paths to the results of the edit. Containers, None and the values, that
+    the edit doesn't apply to, are skipped.
+
+    Args:
+        doc (JSONDocument): edited document
+        paths (list[tuple]): JSON paths of the values
+        edit (callable): compiled edit, see compile_edit
+        choices (dict, optional): dict key -> allowed values (like combo_choice.json), values of these
+            keys are only set to an allowed value. Defaults to None.
+
+    Returns:
+        int: number of set values
+    """
+    choices = choices or {}
+    count = 0
+    for path in paths:
+        old = doc.get(path)
+        if old is None or type(old) in (dict, list, array, MappedList, Unparsed):
+            continue
+        try:
+            new = edit(old)
+        except (ValueError, TypeError, ArithmeticError):
+            continue
+        if path and path[-1] in choices and new not in choices[path[-1]]:
+            continue
+        try:
+            doc.set(path, new)
+        except (OverflowError, TypeError):
+            continue  # the value doesn't fit into the compact array
+        count += 1
+    return count
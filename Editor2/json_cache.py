@@ -0,0 +1,158 @@
+"""
+Parse cache of the JSON editor
+
+Switching between result files would repeat json.loads, the search index and the flattening of the tree
+records for each file. The DocumentCache keeps the recently shown documents with their tree records (see
+JSONTreeFrame.iter_tree_records), keyed by the version of the file (path, modification time and size), so
+a file, that hasn't changed on disk, is shown again without parsing. The memory of a document is estimated
+from its JSON text. Documents beyond the memory cap are evicted least recently used first, unless they are
+open. An edited document no longer matches its file and is dropped, once it is closed.
+"""
+import os
+from collections import OrderedDict
+
+
+CACHE_SIZE = 512 * 2**20  # bytes, default memory cap of the cached documents
+SIZE_FACTOR = 8           # estimated memory of a parsed document (objects, search index, source) per JSON character
+RECORD_SIZE = 300         # bytes, estimated memory of a tree record
+
+
+def document_key(fp: str) -> tuple:
+    """Returns the cache key (absolute path, modification time, size) of a file, None if it doesn't exist
+    """
+    try:
+        stat = os.stat(fp)
+    except OSError:
+        return None
+    return os.path.abspath(fp), stat.st_mtime_ns, stat.st_size
+
+
+class CacheEntry:
+    def __init__(self, doc):
+        """Cached document and the tree records of its first display
+
+        Args:
+            doc (JSONDocument): document as parsed from the file
+        """
+        self.doc = doc
+        self.records = None   # list of the tree records (parent, iid, field, values, tag), see set_records
+        self.lazy = False     # records of a lazy display (one level)
+        self.index = {}       # iid -> JSON path of the nodes of the records
+        self.buckets = {}     # bucket node -> (JSON path of the list, range of list indices)
+        self.unloaded = set()  # nodes of the records, whose children are not inserted
+        self.changed = False  # the document has been edited and doesn't match its file anymore
+        self.size = self.estimate_size()
+        doc.listeners.append(self.on_change)
+
+
+    def estimate_size(self) -> int:
+        """Returns the estimated memory [bytes] of the document and the records
+        """
+        size = len(self.doc.source.text) * SIZE_FACTOR if self.doc.source else 0
+        return size + len(self.records or ()) * RECORD_SIZE
+
+
+    def set_records(self, records: list, lazy: bool, index: dict, buckets: dict, unloaded: set) -> None:
+        self.records = records
+        self.lazy = lazy
+        self.index = index
+        self.buckets = buckets
+        self.unloaded = unloaded
+        self.size = self.estimate_size()
+
+
+    def on_change(self, action: str, path: tuple, old: object, new: object) -> None:
+        self.changed = True  # the listener is removed on eviction, not while the listeners are called
+
+
+    def close(self) -> None:
+        if self.on_change in self.doc.listeners:
+            self.doc.listeners.remove(self.on_change)
+
+
+class DocumentCache:
+    def __init__(self, max_size: int = CACHE_SIZE):
+        """LRU cache of parsed documents, see the module docstring
+
+        Args:
+            max_size (int, optional): memory cap [bytes] of the cached documents, the open ones are never
+                evicted. Defaults to CACHE_SIZE.
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()  # document_key -> CacheEntry, least recently used first
+        self.open_counts = {}         # document_key -> number of frames showing the document
+
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+    @property
+    def size(self) -> int:
+        """Estimated memory [bytes] of the cached documents
+        """
+        return sum(entry.size for entry in self.entries.values())
+
+
+    def get(self, key: tuple) -> CacheEntry:
+        """Returns the entry of the key (and marks it as recently used), None if it isn't cached or its
+        document has been edited
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry.changed:
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+
+    def put(self, key: tuple, doc) -> CacheEntry:
+        """Caches a parsed document, its tree records are added by set_records once they are inserted
+        """
+        if key in self.entries:
+            self.entries.pop(key).close()
+        entry = self.entries[key] = CacheEntry(doc)
+        self.evict()
+        return entry
+
+
+    def set_records(self, entry: CacheEntry, *args) -> None:
+        """Adds the tree records to the entry, see CacheEntry.set_records for the arguments
+        """
+        entry.set_records(*args)
+        self.evict()
+
+
+    def open(self, key: tuple) -> None:
+        self.open_counts[key] = self.open_counts.get(key, 0) + 1
+
+
+    def close(self, key: tuple) -> None:
+        """Releases a document, that is no longer shown by a frame. It may be evicted now.
+        """
+        count = self.open_counts.pop(key, 0) - 1
+        if count > 0:
+            self.open_counts[key] = count
+        self.evict()
+
+
+    def is_open(self, key: tuple) -> bool:
+        return key in self.open_counts
+
+
+    def evict(self) -> None:
+        """Drops the edited documents and the least recently used ones beyond max_size, unless they are open
+        """
+        size = self.size
+        for key, entry in list(self.entries.items()):
+            if key in self.open_counts:
+                continue
+            if entry.changed or size > self.max_size:
+                size -= entry.size
+                del self.entries[key]
+                entry.close()
+
+
+    def clear(self) -> None:
+        for entry in self.entries.values():
+            entry.close()
+        self.entries.clear()
@@ -0,0 +1,246 @@
+"""
+Structural diff of JSON objects for the JSON editor
+
+diff compares two parsed JSON objects and returns the changes, that turn the old object into the new one,
+as a list of (action, path, value). Unchanged subtrees are skipped after a type-strict comparison (see
+same_tree), changed subtrees are found by a single (C level) comparison.
+"""
+from array import array
+
+
+CHILDREN = (dict, list, array)  # items, that same_tree compares beyond their type
+
+
+def same_tree_value(a: object, b: object) -> bool:
+    """Returns True, if a and b are equal and of the same type (True is not 1, [1] is not array('q', [1]))
+    """
+    if type(a) is not type(b):
+        return False
+    if type(a) is array:
+        return a.typecode == b.typecode and a == b
+    return a == b
+
+
+def same_tree(a: object, b: object) -> bool:
+    """Returns True, if two JSON objects are equal and have the same types throughout, unlike == 
+    ({"a": 1} == {"a": True} and [1.0] == [1]). The order of dict keys is ignored like by ==.
+    """
+    if a != b:
+        return False  # C level, no walk of a changed subtree
+    stack = [(a, b)]
+    while stack:
+        a, b = stack.pop()
+        if type(a) is dict:
+            if list(a) != list(b):
+                b = {key: b[key] for key in a}  # the same items in another order
+            a, b = list(a.values()), list(b.values())
+        elif type(a) is not list:
+            if not same_tree_value(a, b):
+                return False
+            continue
+        if list(map(type, a)) != list(map(type, b)):
+            return False
+        stack.extend((x, y) for x, y in zip(a, b) if type(x) in CHILDREN)
+    return True
+
+
+def diff(old: object, new: object) -> list[tuple]:
+    """Compares two JSON objects, dicts by key and lists by index.
+
+    Args:
+        old (JSON-able object): Python object before the change, that may contain compact arrays
+        new (JSON-able object): Python object after the change
+
+    Returns:
+        list[tuple]: changes (action, path, value) with the actions
+            "set": the value at path is replaced (scalars, type changes, compact arrays, reordered dicts),
+            "delete": the dict item or list item at path is removed (list items from the end), value is None,
+            "insert": the dict item or list item at path is added (in the order of new)
+    """
+    changes = []
+    stack = [((), old, new)]
+    while stack:
+        path, a, b = stack.pop()
+        if type(a) is not type(b) or type(a) not in (dict, list):
+            if not same_tree_value(a, b):
+                changes.append(("set", path, b))
+            continue
+        if same_tree(a, b):
+            continue
+
+        if type(a) is dict:
+            common = [key for key in a if key in b]
+            if common != [key for key in b if key in a]:
+                changes.append(("set", path, b))  # the order of the keys has changed
+                continue
+            changes.extend(("delete", path + (key, ), None) for key in a if key not in b)
+            changes.extend(("insert", path + (key, ), value) for key, value in b.items() if key not in a)
+            stack.extend((path + (key, ), a[key], b[key]) for key in reversed(common))
+        else:
+            n = min(len(a), len(b))
+            changes.extend(("delete", path + (i, ), None) for i in reversed(range(n, len(a))))
+            changes.extend(("insert", path + (i, ), b[i]) for i in range(n, len(b)))
+            stack.extend((path + (i, ), a[i], b[i]) for i in reversed(range(n)))
+    return changes
+
+
+CONTAINERS = (dict, list)
+MISSING = object()  # the counterpart of an added or removed item
+
+
+def subtree_hashes(obj: object) -> dict:
+    """Hashes the dicts and lists of a JSON object bottom-up, from the hashes of the child containers and 
+    the repr of the scalars (type sensitive, True is not 1). The hash of a dict doesn't depend on the order 
+    of its keys. Containers without child containers are hashed without a Python loop over their items.
+
+    Returns:
+        dict: id of the dict or list -> hash of its subtree
+    """
+    hashes = {}
+    stack = [(obj, False)]
+    while stack:
+        value, children_done = stack.pop()
+        if type(value) not in CONTAINERS:
+            continue
+        values = value.values() if type(value) is dict else value
+        if children_done:
+            reprs = [hashes[id(val)] if type(val) in CONTAINERS else repr(val) for val in values]
+        elif set(map(type, values)).isdisjoint(CONTAINERS):
+            reprs = map(repr, values)
+        else:
+            stack.append((value, True))
+            stack.extend((val, False) for val in values if type(val) in CONTAINERS)
+            continue
+        hashes[id(value)] = hash(frozenset(zip(value, reprs))) if type(value) is dict else hash(tuple(reprs))
+    return hashes
+
+
+def json_kind(value: object) -> type:
+    """Returns the JSON type of a value (compact arrays are lists)
+    """
+    return list if type(value) is array else type(value)
+
+
+class Comparison:
+    def __init__(self, left: object, right: object, key: str = None, progress=None):
+        """Compares two JSON objects, like a result and a reference. The subtrees are hashed bottom-up, 
+        such that identical branches are skipped with a single hash comparison.
+
+        Args:
+            left (JSON-able object): Python object of the left document, that may contain compact arrays
+            right (JSON-able object): Python object of the right document
+            key (str, optional): Lists of dicts, that all have this key with unique values, are matched 
+                by the value of the key instead of the index. Defaults to None.
+            progress (callable, optional): Called with the progress (0..1) of hashing. Defaults to None.
+        """
+        self.left = left
+        self.right = right
+        self.key = key
+        self.key_indices = {}  # (side, JSON path of a list) -> {key value: index} or None, see key_index
+        self.left_hashes = subtree_hashes(left)
+        if progress:
+            progress(0.5)
+        self.right_hashes = subtree_hashes(right)
+        if progress:
+            progress(1.0)
+        self.differences = []  # (status, left path, right path) in the order of the left document
+        self.left_tags = {}    # JSON path -> status of the differing nodes of the left document
+        self.right_tags = {}
+        self.compare()
+
+
+    def compare(self) -> None:
+        """Finds the differences with the status "added", "removed", "changed" (scalar value) or "type" 
+        (JSON type). The missing side of an added or removed item is the path of its container.
+        """
+        stack = [((), (), self.left, self.right)]
+        while stack:
+            left_path, right_path, a, b = stack.pop()
+            if a is MISSING or b is MISSING:
+                status = "added" if a is MISSING else "removed"
+            elif json_kind(a) is not json_kind(b):
+                status = "type"
+            elif type(a) in CONTAINERS and type(a) is type(b) and self.left_hashes[id(a)] == self.right_hashes[id(b)]:
+                continue  # identical subtree
+            elif type(a) not in CONTAINERS and same_tree_value(a, b):
+                continue
+            elif json_kind(a) is dict:
+                items = [(left_path + (k, ), right_path + (k, ) if k in b else right_path, v, b.get(k, MISSING)) for k, v in a.items()]
+                items += [(left_path, right_path + (k, ), MISSING, v) for k, v in b.items() if k not in a]
+                stack.extend(reversed(items))
+                continue
+            elif json_kind(a) is list:
+                stack.extend(reversed(self.match_items(left_path, right_path, a, b)))
+                continue
+            else:
+                status = "changed"
+            self.differences.append((status, left_path, right_path))
+            if status != "added":
+                self.left_tags[left_path] = status
+            if status != "removed":
+                self.right_tags[right_path] = status
+
+
+    def match_items(self, left_path: tuple, right_path: tuple, a: list, b: list) -> list[tuple]:
+        """Returns the pairs (left path, right path, left item, right item) of two lists, matched by key 
+        (see key_index) or by index
+        """
+        left_index = self.key_index("left", left_path, a)
+        right_index = self.key_index("right", right_path, b)
+        if left_index is None or right_index is None:
+            n = min(len(a), len(b))
+            items = [(left_path + (i, ), right_path + (i, ), a[i], b[i]) for i in range(n)]
+            items += [(left_path + (i, ), right_path, a[i], MISSING) for i in range(n, len(a))]
+            items += [(left_path, right_path + (i, ), MISSING, b[i]) for i in range(n, len(b))]
+            return items
+
+        items = []
+        for value, i in left_index.items():
+            j = right_index.get(value)
+            items.append((left_path + (i, ), right_path + (j, ) if j is not None else right_path, a[i], MISSING if j is None else b[j]))
+        items += [(left_path, right_path + (j, ), MISSING, b[j]) for value, j in right_index.items() if value not in left_index]
+        return items
+
+
+    def key_index(self, side: str, path: tuple, items: list) -> dict:
+        """Returns {key value: index} of a list of dicts, or None if it can't be matched by key (no key, 
+        an item without the key or with an unhashable or duplicate key value)
+        """
+        if (side, path) in self.key_indices:
+            return self.key_indices[(side, path)]
+        index = None
+        if self.key and type(items) is list and all(type(item) is dict and self.key in item for item in items):
+            try:
+                index = {item[self.key]: i for i, item in enumerate(items)}
+            except TypeError:
+                pass  # unhashable key value
+            if index is not None and len(index) != len(items):
+                index = None  # duplicate key values
+        self.key_indices[(side, path)] = index
+        return index
+
+
+    def counterpart(self, path: tuple, side: str = "left") -> tuple:
+        """Returns the JSON path of the other document, that corresponds to a path of the side ("left" or 
+        "right"), or of its closest ancestor, that has a counterpart
+        """
+        value, other = (self.left, self.right) if side == "left" else (self.right, self.left)
+        other_side = "right" if side == "left" else "left"
+        this_path, other_path = (), ()
+        for key in path:
+            if json_kind(value) is list and json_kind(other) is list:
+                index = self.key_index(side, this_path, value)
+                other_index = self.key_index(other_side, other_path, other)
+                if index is not None and other_index is not None:
+                    other_key = other_index.get(value[key][self.key])
+                else:
+                    other_key = key if key < len(other) else None
+            elif type(value) is dict and type(other) is dict:
+                other_key = key if key in other else None
+            else:
+                other_key = None
+            if other_key is None:
+                break
+            this_path, other_path = this_path + (key, ), other_path + (other_key, )
+            value, other = value[key], other[other_key]
+        return other_path
@@ -0,0 +1,700 @@
+"""
+In-memory document model of the JSON editor
+
+The JSONDocument holds the typed Python object and is the source of truth for the editor.
+Nodes are addressed by their JSON path, a tuple of dict keys and list indices, like ("content", "channels", 0).
+The (Tkinter) Treeview only displays the document, its iids are mapped to paths by the document's index.
+
+Long homogeneous lists of int or float are kept compact as array('q') or array('d') instead of lists of
+Python objects, see JSONDocument.compact_arrays.
+"""
+import bisect, itertools, json, os, shutil
+from array import array
+from collections import OrderedDict
+
+from compression import DEFAULT_LEVEL, compression, iter_read, open_write
+from json_diff import Comparison, diff
+from json_scan import LinesSource, MappedList, MappedSource, SourceMap, Unparsed, parse_lines
+from json_search import SearchIndex
+from parallel import gc_paused, map_parallel
+
+
+CHUNK_SIZE = 1 << 20  # bytes, that are read or written between two progress reports
+COMPACT_MIN_LENGTH = 100  # min. length of homogeneous int or float lists, that are kept as compact array
+MAPPED_CACHE_SIZE = 64    # number of parsed containers or records, that are kept by a Mapped- or JSONLinesDocument
+PARSE_CHUNK_SIZE = 1 << 24  # bytes of JSON Lines, that are parsed per task in parallel, see map_parallel
+FRAGMENT_ITEMS = 100      # containers with more items are serialized from the cached fragments of their items
+FRAGMENT_SIZE = 1 << 16   # max. length of a cached container fragment, larger ones are split into their items
+
+
+def type_tag(value: object) -> str:
+    """Returns the type name of a value as used for the Treeview tags, like "dict", "int" or "NoneType"
+    """
+    if type(value) is array:
+        return "array"
+    if type(value) is MappedList:
+        return "list"
+    if type(value) is Unparsed:
+        return value.tag
+    return str(type(value)).split("'")[1]
+
+
+def compact_list(value: list) -> array:
+    """Returns a list of only int or only float as array('q') or array('d'), None if that's not possible
+    """
+    item_type = type(value[0])
+    if item_type not in (int, float) or not all(type(item) is item_type for item in value):
+        return None
+    try:
+        return array("q" if item_type is int else "d", value)
+    except OverflowError:  # int, that doesn't fit into 64 bit
+        return None
+
+
+def encode_array(value: array) -> str:
+    """Encodes a compact array directly from its buffer like json.dumps would encode the list
+    """
+    if value.typecode == "q":
+        return "[" + ", ".join(map(str, value)) + "]"
+    text = ", ".join(map(float.__repr__, value))
+    if "n" in text:  # nan or inf, that are encoded as NaN or Infinity
+        text = ", ".join(map(json.JSONEncoder().encode, value))
+    return "[" + text + "]"
+
+
+class FragmentCache:
+    """Cache of the serialized JSON fragments of a document's subtrees, that tracks the dirty subtrees.
+
+    The cache is a tree of nodes [text, children] along the JSON paths. Small containers and scalars are
+    cached as a whole (text), large containers are composed from the fragments of their children. A change
+    drops the fragments along its path, hence only the dirty subtrees are serialized again on the next save.
+    """
+    def __init__(self):
+        self.root = [None, {}]
+
+
+    def clear_texts(self, path: tuple) -> list:
+        """Drops the cached fragments along the JSON path and returns its cache node, None if there is none
+        """
+        node = self.root
+        node[0] = None
+        for key in path:
+            node = node[1].get(key)
+            if node is None:
+                return None
+            node[0] = None
+        return node
+
+
+    def on_change(self, action: str, path: tuple, old: object, new: object) -> None:
+        """Marks the changed subtree dirty, see JSONDocument.listeners
+        """
+        if action == "rename":
+            if not path:
+                return  # the root name is not part of the document
+            parent = self.clear_texts(path[:-1])
+            if parent and old in parent[1]:  # the fragment of the renamed value is still valid
+                parent[1][new] = parent[1].pop(old)
+        else:
+            node = self.clear_texts(path)
+            if node:
+                node[1].clear()
+
+
+class JSONDocument:
+    def __init__(self, obj: object = None, name: str = ""):
+        """JSON document with an index mapping Treeview iids to JSON paths
+
+        Args:
+            obj (JSON-able object, optional): Python object of the document. Defaults to None.
+            name (str, optional): Name of the document, shown as root field. Defaults to "".
+        """
+        self.obj = obj
+        self.name = name
+        self.iids = {}   # iid -> path
+        self.paths = {}  # path -> iid
+        self.iid_counter = itertools.count(1)
+        self.listeners = []       # called with (action, path, old, new) on "set" and "rename" changes
+        self.search_index = None  # SearchIndex, see build_search_index
+        self.source = None        # SourceMap of the loaded JSON text, see attach_source
+        self.readonly = False     # no edits, if True
+        self.array_paths = set()  # JSON paths of the compact arrays, see compact_arrays
+        self.fragments = FragmentCache()  # serialized subtrees, that are reused on save
+        self.listeners.append(self.fragments.on_change)
+
+
+    def new_iid(self) -> str:
+        """Returns a new, unique Treeview iid for a node of this document
+        """
+        return f"n{next(self.iid_counter)}"
+
+
+    def register(self, iid: str, path: tuple) -> None:
+        self.iids[iid] = path
+        self.paths[path] = iid
+
+
+    def forget(self, iid: str) -> None:
+        path = self.iids.pop(iid, None)
+        if self.paths.get(path) == iid:
+            del self.paths[path]
+
+
+    def clear_index(self) -> None:
+        self.iids.clear()
+        self.paths.clear()
+
+
+    def notify(self, action: str, path: tuple, old: object, new: object) -> None:
+        for listener in self.listeners:
+            listener(action, path, old, new)
+
+
+    def build_search_index(self, progress=None) -> None:
+        """Builds the SearchIndex of the document, that is updated on each change
+        """
+        if self.search_index:
+            self.listeners.remove(self.search_index.on_change)
+        self.search_index = SearchIndex(self.obj, progress)
+        self.listeners.append(self.search_index.on_change)
+
+
+    def attach_source(self, text: str, encoding: str = "utf-8") -> None:
+        """Keeps the JSON text, that the document has been parsed from, such that it can be saved format 
+        preserving, see SourceMap
+        """
+        if self.source:
+            self.listeners.remove(self.source.on_change)
+        self.source = SourceMap(text, encoding)
+        self.listeners.append(self.source.on_change)
+
+
+    def compact_arrays(self) -> None:
+        """Replaces the homogeneous int and float lists with at least COMPACT_MIN_LENGTH items by compact
+        arrays, see compact_list
+        """
+        stack = [((), self.obj)]
+        while stack:
+            path, value = stack.pop()
+            if type(value) is list and len(value) >= COMPACT_MIN_LENGTH:
+                compact = compact_list(value)
+                if compact is not None:
+                    if path:
+                        self.get(path[:-1])[path[-1]] = compact
+                    else:
+                        self.obj = compact
+                    self.array_paths.add(path)
+                    continue
+            if type(value) in (dict, list):
+                items = value.items() if type(value) is dict else enumerate(value)
+                stack.extend((path + (key, ), val) for key, val in items if type(val) in (dict, list))
+
+
+    def plain(self, path: tuple = ()) -> object:
+        """Returns the value at the JSON path as JSON-able object, with lists instead of compact arrays.
+        Only the containers of compact arrays are copied.
+        """
+        value = self.get(path)
+        n = len(path)
+        if not any(p[:n] == path for p in self.array_paths):
+            return value
+        if type(value) is array:
+            return value.tolist()
+        if type(value) is dict:
+            return {key: self.plain(path + (key, )) for key in value}
+        return [self.plain(path + (i, )) for i in range(len(value))]
+
+
+    def get(self, path: tuple) -> object:
+        """Returns the value at the JSON path
+        """
+        value = self.obj
+        for key in path:
+            value = value[key]
+        return value
+
+
+    def value(self, iid: str) -> object:
+        """Returns the value of the tree node iid
+        """
+        return self.get(self.iids[iid])
+
+
+    def children(self, path: tuple):
+        """Returns an iterable of (key, value) of the dict or list at the JSON path
+        """
+        value = self.get(path)
+        return value.items() if type(value) is dict else enumerate(value)
+
+
+    def set(self, path: tuple, value: object) -> object:
+        """Sets the value at the JSON path and returns the previous value
+        """
+        if not path:
+            old, self.obj = self.obj, value
+        else:
+            parent = self.get(path[:-1])
+            old = parent[path[-1]]
+            parent[path[-1]] = value  # raises OverflowError or TypeError, if value doesn't fit into an array
+        if type(old) in (dict, list, array) or type(value) is array:
+            self.array_paths = {p for p in self.array_paths if p[:len(path)] != path}
+            if type(value) is array:
+                self.array_paths.add(path)
+        self.notify("set", path, old, value)
+        return old
+
+
+    def rename(self, path: tuple, key: str) -> tuple:
+        """Renames the dict key at the JSON path, keeping the order of the dict.
+
+        Args:
+            path (tuple): JSON path of the dict item
+            key (str): new key
+
+        Returns:
+            tuple: new JSON path or None, if the item is not within a dict or the key already exists
+        """
+        if not path:
+            old, self.name = self.name, key
+            self.notify("rename", path, old, key)
+            return path  # the root name is not part of the document
+
+        parent = self.get(path[:-1])
+        if type(parent) is not dict or key in parent:
+            return None
+
+        items = [(key if k == path[-1] else k, v) for k, v in parent.items()]
+        parent.clear()
+        parent.update(items)
+
+        new_path = path[:-1] + (key, )
+        n = len(path)
+        for iid, p in list(self.iids.items()):  # move the index of the renamed subtree
+            if p[:n] == path:
+                self.forget(iid)
+                self.register(iid, new_path + p[n:])
+        self.array_paths = {new_path + p[n:] if p[:n] == path else p for p in self.array_paths}
+        self.notify("rename", path, path[-1], key)
+        return new_path
+
+
+class MappedDocument(JSONDocument):
+    def __init__(self, fp: str, progress=None):
+        """Read-only JSONDocument of a memory-mapped JSON file, see MappedSource. Dicts are parsed one level
+        at a time when accessed, with Unparsed stand-ins for their child containers, lists are MappedLists.
+        Only the last MAPPED_CACHE_SIZE parsed dicts are kept.
+
+        Args:
+            fp (str): file path
+            progress (callable, optional): Called with the progress (0..1) of scanning the root container.
+                Defaults to None.
+        """
+        super().__init__(name=fp)
+        self.readonly = True
+        self.mapping = MappedSource(fp)
+        if self.mapping.data[self.mapping.start()] in b"[{":
+            self.mapping.scan((), progress)
+        self.cache = OrderedDict()  # JSON path -> parsed dict or MappedList
+        self.obj = self.get(())
+
+
+    def get(self, path: tuple) -> object:
+        """Returns the value at the JSON path, a dict or MappedList for containers
+        """
+        if path in self.cache:
+            self.cache.move_to_end(path)
+            return self.cache[path]
+
+        value = self.mapping.value(*self.mapping.span(path))
+        if type(value) is not Unparsed:
+            return value
+        offsets = self.mapping.scan(path)
+        if type(offsets) is dict:
+            value = {key: self.mapping.value(*span) for key, span in offsets.items()}
+        else:
+            starts, ends = offsets
+            value = MappedList(lambda i: self.mapping.value(starts[i], ends[i]), len(starts))
+        self.cache[path] = value
+        if len(self.cache) > MAPPED_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return value
+
+
+    def plain(self, path: tuple = ()) -> object:
+        """Returns the (fully parsed) value at the JSON path
+        """
+        return self.mapping.parse(path)
+
+
+class JSONLinesDocument(JSONDocument):
+    def __init__(self, fp: str, parse: bool = False, progress=None):
+        """JSONDocument of a memory-mapped JSON Lines file, see LinesSource. The document is the list of the
+        records, that are parsed on access. Edited records are kept until they are saved, see write_lines.
+
+        Args:
+            fp (str): file path
+            parse (bool, optional): Parses all records (in parallel) and builds the search index. Defaults 
+                to False.
+            progress (callable, optional): Called with the progress (0..1) of loading. Defaults to None.
+        """
+        super().__init__(name=fp)
+        self.mapping = LinesSource(fp, progress=progress and (lambda fraction: progress((0.2 if parse else 1.0) * fraction)))
+        self.records = {}           # line -> edited record
+        self.cache = OrderedDict()  # line -> parsed record
+        self.obj = MappedList(self.record, len(self.mapping))
+        if parse:
+            with gc_paused():
+                self.parse_records(progress=progress and (lambda fraction: progress(0.2 + 0.5 * fraction)))
+                self.build_search_index(progress=progress and (lambda fraction: progress(0.7 + 0.3 * fraction)))
+
+
+    def parse_records(self, progress=None) -> None:
+        """Parses all records in chunks of about PARSE_CHUNK_SIZE bytes in parallel, see map_parallel. 
+        The document becomes the list of the records. The records of compressed files are parsed in this 
+        process.
+        """
+        if compression(self.mapping.fp):  # the offsets refer to the decompressed data in memory
+            self.obj = [self.mapping.parse(i) for i in range(len(self.mapping))]
+            self.cache.clear()
+            return
+
+        starts, ends = self.mapping.starts, self.mapping.ends
+        chunks, first = [], 0
+        while first < len(starts):
+            last = bisect.bisect_left(starts, starts[first] + PARSE_CHUNK_SIZE, first + 1)
+            chunks.append((self.mapping.fp, starts[first], ends[last - 1]))
+            first = last
+        self.obj = [record for records in map_parallel(parse_lines, chunks, progress) for record in records]
+        self.cache.clear()
+
+
+    def record(self, i: int) -> object:
+        """Returns the record of line i
+        """
+        if i in self.records:
+            return self.records[i]
+        if type(self.obj) is list:
+            return self.obj[i]
+        if i in self.cache:
+            self.cache.move_to_end(i)
+            return self.cache[i]
+        self.cache[i] = self.mapping.parse(i)
+        if len(self.cache) > MAPPED_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return self.cache[i]
+
+
+    def get(self, path: tuple) -> object:
+        if not path:
+            return self.obj
+        value = self.record(path[0])
+        for key in path[1:]:
+            value = value[key]
+        return value
+
+
+    def plain(self, path: tuple = ()) -> object:
+        if not path:
+            return self.obj if type(self.obj) is list else [self.record(i) for i in range(len(self.obj))]
+        return self.get(path)
+
+
+    def set(self, path: tuple, value: object) -> object:
+        """Sets the value at the JSON path (within a record or a whole record) and returns the previous value
+        """
+        self.records[path[0]] = self.record(path[0])  # keep the edited record
+        if len(path) > 1:
+            return super().set(path, value)
+        old, self.records[path[0]] = self.records[path[0]], value
+        self.cache.pop(path[0], None)  # parsed from the file again, once the edits are saved
+        if type(self.obj) is list:
+            self.obj[path[0]] = value
+        self.notify("set", path, old, value)
+        return old
+
+
+    def rename(self, path: tuple, key: str) -> tuple:
+        if len(path) > 1:
+            self.records[path[0]] = self.record(path[0])
+        return super().rename(path, key)
+
+
+def read_text(fp: str, progress=None) -> tuple[str, str]:
+    """Reads a JSON file in chunks and decodes it (UTF-8, -16 or -32 like json.loads). Compressed files 
+    are decompressed while reading, see compression.
+
+    Args:
+        fp (str): file path
+        progress (callable, optional): Called with the progress (0..1) after each chunk. Defaults to None.
+
+    Returns:
+        tuple[str, str]: JSON text and encoding of the file
+    """
+    data = bytearray()
+    for chunk, fraction in iter_read(fp, CHUNK_SIZE):
+        data += chunk
+        if progress:
+            progress(fraction)
+    encoding = json.detect_encoding(data)
+    return data.decode(encoding, "surrogatepass"), encoding
+
+
+def read_json(fp: str, progress=None) -> object:
+    """Reads a JSON file in chunks and parses it (see read_text for the arguments).
+
+    Returns:
+        object: Python object of the JSON file
+    """
+    text, _ = read_text(fp, progress=progress and (lambda fraction: progress(0.9 * fraction)))
+    obj = json.loads(text)  # parsing (the last 10%) can't report progress
+    if progress:
+        progress(1.0)
+    return obj
+
+
+def load_document(fp: str, progress=None) -> JSONDocument:
+    """Reads a JSON file into a JSONDocument with search index and source map (see read_text for the 
+    arguments)
+    """
+    text, encoding = read_text(fp, progress=progress and (lambda fraction: progress(0.7 * fraction)))
+    with gc_paused():
+        obj = json.loads(text)
+        if progress:
+            progress(0.8)
+        doc = JSONDocument(obj, name=fp)
+        doc.attach_source(text, encoding)
+        doc.compact_arrays()
+        doc.build_search_index(progress=progress and (lambda fraction: progress(0.8 + 0.2 * fraction)))
+    return doc
+
+
+def reload_document(doc: JSONDocument, fp: str, progress=None) -> tuple:
+    """Loads the changed file of a document (see load_document) and compares it to the document
+
+    Returns:
+        tuple: the new JSONDocument and the changes from doc to it, see diff
+    """
+    new_doc = load_document(fp, progress)
+    return new_doc, diff(doc.obj, new_doc.obj)
+
+
+def compare_documents(left_fp: str, right_fp: str, key: str = None, progress=None) -> tuple:
+    """Reads two JSON files (see load_document) as read-only documents and compares them, see Comparison
+
+    Returns:
+        tuple: the left and right JSONDocument and their Comparison
+    """
+    docs = []
+    for i, fp in enumerate((left_fp, right_fp)):
+        docs.append(load_document(fp, progress and (lambda fraction, i=i: progress(0.4 * (i + fraction)))))
+        docs[-1].readonly = True
+    with gc_paused():
+        comparison = Comparison(docs[0].obj, docs[1].obj, key, progress and (lambda fraction: progress(0.8 + 0.2 * fraction)))
+    return docs[0], docs[1], comparison
+
+
+def load_documents(fps: list, progress=None) -> JSONDocument:
+    """Reads several JSON files in parallel (see map_parallel) into a JSONDocument with search index, whose
+    root is a dict {file name: object}
+
+    Args:
+        fps (list): file paths
+        progress (callable, optional): Called with the progress (0..1) of loading. Defaults to None.
+    """
+    with gc_paused():
+        objs = map_parallel(read_json, [(fp, ) for fp in fps], progress=progress and (lambda fraction: progress(0.8 * fraction)))
+        names = [os.path.basename(fp) for fp in fps]
+        doc = JSONDocument(dict(zip(names if len(set(names)) == len(names) else fps, objs)), name=f"{len(fps)} files")
+        doc.compact_arrays()
+        doc.build_search_index(progress=progress and (lambda fraction: progress(0.8 + 0.2 * fraction)))
+    return doc
+
+
+def iterencode(obj: object, array_paths: set = (), fragments: FragmentCache = None):
+    """Encodes obj like json.dump, yielding (chunk, progress) with the progress along the top level items.
+    Subtrees, that have not changed since the last call with the same fragments, are taken from the cache.
+
+    Args:
+        obj (JSON-able object): Python object to be encoded, that may contain compact arrays
+        array_paths (set, optional): JSON paths of the compact arrays in obj. Defaults to ().
+        fragments (FragmentCache, optional): Cache of the serialized subtrees of obj. Defaults to None.
+    """
+    encoder = json.JSONEncoder()
+    branches = {p[:n] for p in array_paths for n in range(len(p) + 1)}  # containers of compact arrays
+    root = (fragments or FragmentCache()).root
+
+    def compose(value, path, node):
+        items = value.items() if type(value) is dict else enumerate(value)
+        yield "{" if type(value) is dict else "["
+        for i, (key, val) in enumerate(items):
+            if i:
+                yield ", "
+            if type(value) is dict:
+                yield encoder.encode(key) + ": "
+            yield from encode(val, path + (key, ), node[1].setdefault(key, [None, {}]))
+        yield "}" if type(value) is dict else "]"
+
+    def encode(value, path, node):
+        if node[0] is not None:
+            yield node[0]
+            return
+        container = type(value) in (dict, list)
+        if container and (len(value) > FRAGMENT_ITEMS or path in branches):
+            yield from compose(value, path, node)
+            return
+        text = encode_array(value) if type(value) is array else encoder.encode(value)
+        if container and len(text) > FRAGMENT_SIZE:
+            yield from compose(value, path, node)
+        else:
+            node[0] = text
+            yield text
+
+    if type(obj) in (dict, list) and obj:
+        items = obj.items() if type(obj) is dict else enumerate(obj)
+        yield "{" if type(obj) is dict else "[", 0.0
+        for i, (key, value) in enumerate(items):
+            if i:
+                yield ", ", i / len(obj)
+            if type(obj) is dict:
+                yield encoder.encode(key) + ": ", i / len(obj)
+            for chunk in encode(value, (key, ), root[1].setdefault(key, [None, {}])):
+                yield chunk, i / len(obj)
+        yield "}" if type(obj) is dict else "]", 1.0
+    else:
+        for chunk in encode(obj, (), root):
+            yield chunk, 1.0
+
+
+def sync_file(fp: str) -> None:
+    """Flushes the written data of a closed file to the disk
+    """
+    with open(fp, "rb+") as file:
+        os.fsync(file.fileno())
+
+
+def sync_directory(fp: str) -> None:
+    """Flushes the directory entry of a created or replaced file to the disk (no-op on Windows, where 
+    directories can't be opened)
+    """
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(fp)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_chunks(chunks, fp: str, encoding: str = "utf-8", compresslevel: int = DEFAULT_LEVEL, progress=None, 
+                 release=None) -> None:
+    """Writes the chunks of a JSON text to a file, that is compressed according to its extension (see 
+    compression). The file is written to a temporary file first, that is synced to the disk and replaces fp
+    when complete. Hence, fp is never left truncated, even if progress raises an exception to cancel or the
+    machine crashes, and the saved content is durable, when write_chunks returns (an edit log may be reset).
+
+    Args:
+        chunks (iterable): (chunk, progress) of the JSON text, see iterencode
+        fp (str): file path
+        encoding (str, optional): Encoding of the file, None for bytes chunks. Defaults to "utf-8".
+        compresslevel (int, optional): Compression level 1..9 of compressed files. Defaults to DEFAULT_LEVEL.
+        progress (callable, optional): Called with the progress (0..1) after each chunk. Defaults to None.
+        release (callable, optional): Called after the chunks are written, before fp is replaced, like to
+            close a memory map of fp. Defaults to None.
+    """
+    tmp = fp + ".tmp"
+    text = {} if encoding is None else {"encoding": encoding, "errors": "surrogatepass", "newline": ""}
+    try:
+        with open_write(tmp, compression(fp), "wb" if encoding is None else "wt", compresslevel, **text) as file:
+            buffer, size, empty = [], 0, b"" if encoding is None else ""
+            for chunk, fraction in chunks:
+                buffer.append(chunk)
+                size += len(chunk)
+                if size >= CHUNK_SIZE:
+                    file.write(empty.join(buffer))
+                    buffer, size = [], 0
+                    if progress:
+                        progress(fraction)
+            file.write(empty.join(buffer))
+        if os.path.exists(fp):
+            shutil.copymode(fp, tmp)
+        sync_file(tmp)
+        if release:
+            release()
+        os.replace(tmp, fp)
+        sync_directory(fp)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if progress:
+        progress(1.0)
+
+
+def write_json(obj: object, fp: str, array_paths: set = (), fragments: FragmentCache = None, 
+               compresslevel: int = DEFAULT_LEVEL, progress=None) -> None:
+    """Writes obj as JSON file, see write_chunks
+
+    Args:
+        obj (JSON-able object): Python object to be written
+        fp (str): file path
+        array_paths (set, optional): JSON paths of the compact arrays in obj. Defaults to ().
+        fragments (FragmentCache, optional): Cache of the serialized subtrees, see iterencode. Defaults to None.
+        compresslevel (int, optional): Compression level 1..9 of compressed files. Defaults to DEFAULT_LEVEL.
+        progress (callable, optional): Called with the progress (0..1) after each chunk. Defaults to None.
+    """
+    write_chunks(iterencode(obj, array_paths, fragments), fp, compresslevel=compresslevel, progress=progress)
+
+
+def iter_lines(doc: JSONLinesDocument, lines: dict):
+    """Yields (chunk, progress) of the JSON Lines file with the lines replaced by lines {line: bytes}
+    """
+    data, starts, ends = doc.mapping.data, doc.mapping.starts, doc.mapping.ends
+    pos = 0
+    for i in sorted(lines):
+        for j in range(pos, starts[i], CHUNK_SIZE):
+            yield data[j:min(j + CHUNK_SIZE, starts[i])], j / len(data)
+        yield lines[i], starts[i] / len(data)
+        pos = ends[i]
+    for j in range(pos, len(data), CHUNK_SIZE):
+        yield data[j:min(j + CHUNK_SIZE, len(data))], j / len(data)
+
+
+def write_lines(doc: JSONLinesDocument, fp: str, compresslevel: int = DEFAULT_LEVEL, progress=None) -> None:
+    """Writes a JSONLinesDocument with only the edited lines serialized. If fp is the document's (not 
+    compressed) file and the edited lines keep their length, they are patched in place. Otherwise the file 
+    is rewritten, see write_chunks.
+    """
+    lines = {i: json.dumps(record).encode() for i, record in doc.records.items()}
+    mapping = doc.mapping
+    same_file = os.path.exists(fp) and os.path.samefile(fp, mapping.fp)
+    if same_file and not compression(fp) and all(len(line) == mapping.ends[i] - mapping.starts[i] for i, line in lines.items()):
+        with open(fp, "r+b") as file:
+            for n, (i, line) in enumerate(sorted(lines.items()), start=1):
+                file.seek(mapping.starts[i])
+                file.write(line)
+                if progress:
+                    progress(n / len(lines))
+            file.flush()
+            os.fsync(file.fileno())
+    else:
+        try:
+            write_chunks(iter_lines(doc, lines), fp, None, compresslevel, progress, mapping.close if same_file else None)
+        finally:
+            if same_file and mapping.closed:
+                doc.mapping = LinesSource(fp)  # the lines have moved (or the file is unchanged, if it failed)
+    if same_file:
+        doc.records.clear()  # the edits are in the file now
+
+
+def save_document(doc: JSONDocument, fp: str, compresslevel: int = DEFAULT_LEVEL, progress=None) -> None:
+    """Writes a JSONDocument as JSON file (see write_chunks for the arguments). A loaded document is saved
+    format preserving, with the edits spliced into its source text. Otherwise, only the subtrees changed 
+    since the last save are serialized.
+    """
+    if type(doc) is JSONLinesDocument:
+        write_lines(doc, fp, compresslevel, progress)
+    elif doc.source:
+        chunks = doc.source.iter_splice(lambda path: json.dumps(doc.plain(path)), CHUNK_SIZE)
+        write_chunks(chunks, fp, doc.source.encoding, compresslevel, progress)
+    else:
+        write_json(doc.obj, fp, doc.array_paths, doc.fragments, compresslevel, progress)
@@ -0,0 +1,147 @@
+"""
+Undo and redo of the JSON editor
+
+The EditHistory records the changes of a JSONDocument as deltas (action, path, old, new), see
+JSONDocument.listeners. The document is never copied: a delta holds the replaced value and its
+replacement, hence the memory is proportional to the edits. Undo and redo apply a step's deltas with
+JSONDocument.set and .rename, independent of the document size.
+"""
+import contextlib, time
+
+
+COALESCE_TIME = 2.0  # s, consecutive edits of the same cell within this time are undone in one step
+
+
+def same_value(a: object, b: object) -> bool:
+    """Returns True, if a and b are the same scalar (containers are never compared, True is not 1)
+    """
+    return a is b or type(a) is type(b) and type(a) in (str, int, float, bool) and a == b
+
+
+def renamed_path(path: tuple, key: str) -> tuple:
+    """Returns the JSON path of a dict item after renaming it to key (the root keeps its empty path)
+    """
+    return path[:-1] + (key, ) if path else ()
+
+
+class EditHistory:
+    def __init__(self, doc):
+        """Undo and redo stacks of the changes of a document
+
+        Args:
+            doc (JSONDocument): Document, whose changes are recorded
+        """
+        self.doc = doc
+        self.undo_steps = []  # steps, a step is a list of deltas (action, path, old, new) in order
+        self.redo_steps = []
+        self.last_edit = float("-inf")  # time.monotonic() of the last recorded change
+        self.applying = False  # changes made by undo and redo aren't recorded
+        self.grouping = False  # changes are recorded in the last step, see group
+        doc.listeners.append(self.on_change)
+
+
+    def close(self) -> None:
+        """Stops recording the changes of the document
+        """
+        if self.on_change in self.doc.listeners:
+            self.doc.listeners.remove(self.on_change)
+
+
+    def on_change(self, action: str, path: tuple, old: object, new: object) -> None:
+        """Records a change as delta, see JSONDocument.listeners. A change of the same cell as the last one
+        within COALESCE_TIME is merged into the last step.
+        """
+        if self.applying or action == "set" and same_value(old, new):
+            return
+        if self.grouping:
+            self.undo_steps[-1].append((action, path, old, new))
+            self.redo_steps.clear()
+            return
+        now = time.monotonic()
+        last = self.undo_steps[-1] if self.undo_steps else None
+        if last and len(last) == 1 and now - self.last_edit < COALESCE_TIME and self.continues(last[0], action, path):
+            self.undo_steps.pop()
+            path, old = last[0][1], last[0][2]
+            if not (same_value(old, new) if action == "set" else old == new):  # unless the edits cancel out
+                self.undo_steps.append([(action, path, old, new)])
+        else:
+            self.undo_steps.append([(action, path, old, new)])
+        self.redo_steps.clear()
+        self.last_edit = now
+
+
+    def continues(self, delta: tuple, action: str, path: tuple) -> bool:
+        """Returns True, if the change (action, path) edits the same cell as delta
+        """
+        if action != delta[0]:
+            return False
+        if action == "set":
+            return path == delta[1]
+        return path == renamed_path(delta[1], delta[3])
+
+
+    def undo(self) -> tuple:
+        """Reverts the last step
+
+        Returns:
+            tuple: JSON path of the reverted change or None, if there is nothing to undo
+        """
+        if not self.undo_steps:
+            return None
+        step = self.undo_steps.pop()
+        with self.apply():
+            for action, path, old, new in reversed(step):
+                if action == "set":
+                    self.doc.set(path, old)
+                else:
+                    self.doc.rename(renamed_path(path, new), old)
+        self.redo_steps.append(step)
+        return step[0][1]
+
+
+    def redo(self) -> tuple:
+        """Repeats the last undone step
+
+        Returns:
+            tuple: JSON path of the repeated change or None, if there is nothing to redo
+        """
+        if not self.redo_steps:
+            return None
+        step = self.redo_steps.pop()
+        with self.apply():
+            for action, path, old, new in step:
+                if action == "set":
+                    self.doc.set(path, new)
+                else:
+                    self.doc.rename(path, new)
+        self.undo_steps.append(step)
+        return renamed_path(step[-1][1], step[-1][3]) if step[-1][0] == "rename" else step[-1][1]
+
+
+    @contextlib.contextmanager
+    def group(self):
+        """Context, in which the changes are recorded as a single step, like a bulk edit
+        """
+        self.undo_steps.append([])
+        self.grouping = True
+        try:
+            yield
+        finally:
+            self.grouping = False
+            self.last_edit = float("-inf")
+            if not self.undo_steps[-1]:
+                self.undo_steps.pop()
+
+
+    @contextlib.contextmanager
+    def apply(self):
+        """Context, in which the document changes are not recorded. Undo and redo steps aren't coalesced
+        with the next edit.
+        """
+        self.applying = True
+        try:
+            yield
+        finally:
+            self.applying = False
+            self.last_edit = float("-inf")
+
@@ -0,0 +1,145 @@
+"""
+Crash-safe edit log of the JSON editor
+
+The EditLog appends each change of a JSONDocument as a line [action, path, new value] to a write-ahead
+log next to its file (like "config.json.wal"). The lines are written and fsynced by a background thread,
+hence an edit costs the size of the edit, not of the document. The first line of the log identifies the
+version of the file (size and modification time), that the edits apply to. After the file has been saved,
+the log is reset.
+
+If the editor dies, the edits are replayed from the log, when the file is opened again, see read_log and
+replay_log.
+"""
+import json, os, queue, threading
+from array import array
+
+
+LOG_SUFFIX = ".wal"  # appended to the file path of the document
+
+
+def log_path(fp: str) -> str:
+    return fp + LOG_SUFFIX
+
+
+def file_version(fp: str) -> dict:
+    """Returns the header of the log, that identifies the version of the file
+    """
+    stat = os.stat(fp)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def encode_default(value: object) -> object:
+    """json.dumps default for the compact arrays in the logged values
+    """
+    if type(value) is array:
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def read_log(fp: str) -> list[tuple]:
+    """Reads the edits of the log of a file
+
+    Args:
+        fp (str): file path of the document (not of the log)
+
+    Returns:
+        list[tuple]: (action, path, new value) of the logged edits, empty if there is no log or it belongs
+            to another version of the file
+    """
+    try:
+        with open(log_path(fp), "r", encoding="utf-8") as file:
+            lines = file.read().split("\n")
+        if json.loads(lines[0]) != file_version(fp):
+            return []
+    except (OSError, ValueError):
+        return []
+
+    edits = []
+    for line in lines[1:]:
+        try:
+            action, path, new = json.loads(line)
+        except ValueError:
+            break  # the last line is torn, if the editor died while writing it
+        edits.append((action, tuple(path), new))
+    return edits
+
+
+def replay_log(doc, edits: list[tuple]) -> None:
+    """Applies the edits of read_log to a JSONDocument
+    """
+    for action, path, new in edits:
+        if action == "set":
+            doc.set(path, new)
+        else:
+            doc.rename(path, new)
+
+
+class EditLog:
+    def __init__(self, doc, fp: str, replayed: int = 0):
+        """Write-ahead log of the changes of a document, see JSONDocument.listeners
+
+        Args:
+            doc (JSONDocument): Document, whose changes are logged
+            fp (str): file path of the document
+            replayed (int, optional): Number of edits replayed from an existing log, that is continued.
+                Defaults to 0, which removes an existing log and starts a new one with the first edit.
+        """
+        self.doc = doc
+        self.fp = fp
+        self.edits = replayed  # number of logged edits since the last save
+        self.header = None if replayed else json.dumps(file_version(fp)) + "\n"  # written with the first edit
+        if not replayed and os.path.exists(log_path(fp)):
+            os.remove(log_path(fp))
+        self.file = None
+        self.queue = queue.Queue()  # lines to be written, or None to stop the writer thread
+        self.writer = threading.Thread(target=self.write, daemon=True)
+        self.writer.start()
+        doc.listeners.append(self.on_change)
+
+
+    def on_change(self, action: str, path: tuple, old: object, new: object) -> None:
+        if self.header:
+            self.queue.put(self.header)
+            self.header = None
+        self.queue.put(json.dumps([action, path, new], default=encode_default) + "\n")
+        self.edits += 1
+
+
+    def write(self) -> None:
+        """Writer thread, that appends the queued lines to the log and fsyncs them
+        """
+        while True:
+            lines = [self.queue.get()]
+            while not self.queue.empty():
+                lines.append(self.queue.get())
+            stop = None in lines
+            lines = [line for line in lines if line is not None]
+            if lines:
+                if self.file is None:
+                    self.file = open(log_path(self.fp), "a", encoding="utf-8")
+                self.file.write("".join(lines))
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            if stop:
+                if self.file:
+                    self.file.close()
+                return
+
+
+    def reset(self) -> None:
+        """Starts a new log after the document has been saved to its file
+        """
+        self.edits = 0
+        self.close()
+        self.__init__(self.doc, self.fp)
+
+
+    def close(self) -> None:
+        """Stops logging. The log is removed, if it has no edits since the last save.
+        """
+        if self.on_change in self.doc.listeners:
+            self.doc.listeners.remove(self.on_change)
+        self.queue.put(None)
+        self.writer.join()
+        if not self.edits and os.path.exists(log_path(self.fp)):
+            os.remove(log_path(self.fp))
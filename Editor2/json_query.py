@@ -0,0 +1,332 @@
+"""
+JSONPath-like queries of the JSON editor
+
+A query like "$.lanes[*].pattern", "$..ber" or "$..[?(@ > 0.5)]" is compiled once into a list of steps
+(see compile_query, which keeps the recently used queries in an LRU cache) and evaluated against the
+Python object of a document, not against the Treeview. The steps are matched like an automaton along the
+JSON paths, such that a walk only descends into the branches, that can still match.
+
+Syntax:
+    $                   root
+    .name  ['name']     dict item
+    [0]  [-1]           list item
+    [1:10]  [::2]       list slice
+    .*  [*]             all items
+    ..                  all descendants, like $..name or $..[*]
+    [?(@.key > 1)]      items, whose value (or a value below) passes a filter with ==, !=, <, <=, > or >=
+                        and a number, 'string', true, false or null; [?(@.key)] tests the existence
+
+QueryResults keeps the matches of a query in a document and re-evaluates only the changed branches.
+"""
+import functools, re
+from array import array
+
+from json_scan import MappedList
+from json_search import iter_items
+
+
+QUERY_CACHE_SIZE = 64  # number of compiled queries in the LRU cache
+
+NAME = re.compile(r'[^.\[\]\s()=!<>]+')
+INDEX = re.compile(r'-?\d+')
+SLICE = re.compile(r'(-?\d*):(-?\d*)(?::(-?\d*))?')
+STRING = re.compile(r'"((?:[^"\\]|\\.)*)"|\'((?:[^\'\\]|\\.)*)\'')
+OPERATOR = re.compile(r'\s*(==|!=|<=|>=|<|>)\s*')
+LITERAL = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null')
+LITERALS = {"true": True, "false": False, "null": None}
+LISTS = (list, array, MappedList)
+
+
+def is_number(value: object) -> bool:
+    return type(value) in (int, float)
+
+
+def compare(a: object, operator: str, b: object) -> bool:
+    """Compares like JSON: numbers with numbers, strings with strings, any other value only for equality
+    of the same type (True is not 1)
+    """
+    if operator in ("==", "!="):
+        equal = (type(a) is type(b) or is_number(a) and is_number(b)) and a == b
+        return equal if operator == "==" else not equal
+    if not (is_number(a) and is_number(b) or type(a) is str and type(b) is str):
+        return False
+    if operator == "<":
+        return a < b
+    if operator == "<=":
+        return a <= b
+    if operator == ">":
+        return a > b
+    return a >= b
+
+
+class Query:
+    def __init__(self, text: str):
+        """Compiles a query, see the module docstring for the syntax
+
+        Args:
+            text (str): query like "$.lanes[*].pattern"
+
+        Raises:
+            ValueError: syntax error
+        """
+        self.text = text
+        self.steps = []    # (kind, argument) with kind "name", "index", "slice", "all", "filter" or "descend"
+        self.lookahead = 0  # max. depth of a filter path, the values below a node, that decide a match
+        self.parse(text.strip())
+
+
+    def parse(self, text: str) -> None:
+        if not text.startswith("$"):
+            raise ValueError("A query starts with '$'")
+        pos = 1
+        while pos < len(text):
+            if text.startswith("..", pos):
+                self.steps.append(("descend", None))
+                pos += 2
+                if pos < len(text) and text[pos] != "[":
+                    pos = self.parse_name(text, pos)
+            elif text[pos] == ".":
+                pos = self.parse_name(text, pos + 1)
+            elif text[pos] == "[":
+                pos = self.parse_bracket(text, pos + 1)
+            else:
+                raise ValueError(f"Unexpected '{text[pos]}' at {pos}")
+
+
+    def parse_name(self, text: str, pos: int) -> int:
+        if text.startswith("*", pos):
+            self.steps.append(("all", None))
+            return pos + 1
+        m = NAME.match(text, pos)
+        if not m:
+            raise ValueError(f"Name expected at {pos}")
+        self.steps.append(("name", m.group()))
+        return m.end()
+
+
+    def parse_bracket(self, text: str, pos: int) -> int:
+        """Parses the selector within brackets from pos (after "[") and returns the position after "]"
+        """
+        if text.startswith("*", pos):
+            self.steps.append(("all", None))
+            pos += 1
+        elif text.startswith("?(", pos):
+            pos = self.parse_filter(text, pos + 2)
+        elif m := STRING.match(text, pos):
+            self.steps.append(("name", unquote(m)))
+            pos = m.end()
+        elif (m := SLICE.match(text, pos)) and text.startswith("]", m.end()):
+            self.steps.append(("slice", slice(*(int(g) if g else None for g in m.groups()))))
+            pos = m.end()
+        elif m := INDEX.match(text, pos):
+            self.steps.append(("index", int(m.group())))
+            pos = m.end()
+        else:
+            raise ValueError(f"Invalid selector at {pos}")
+        if not text.startswith("]", pos):
+            raise ValueError(f"']' expected at {pos}")
+        return pos + 1
+
+
+    def parse_filter(self, text: str, pos: int) -> int:
+        """Parses a filter "@.path op literal" from pos (after "?(") and returns the position after ")"
+        """
+        pos = skip_spaces(text, pos)
+        if not text.startswith("@", pos):
+            raise ValueError(f"'@' expected at {pos}")
+        pos += 1
+        path = []
+        while True:
+            if text.startswith(".", pos) and (m := NAME.match(text, pos + 1)):
+                path.append(m.group())
+                pos = m.end()
+            elif text.startswith("[", pos) and (m := STRING.match(text, pos + 1) or INDEX.match(text, pos + 1)) and text.startswith("]", m.end()):
+                path.append(unquote(m) if m.re is STRING else int(m.group()))
+                pos = m.end() + 1
+            else:
+                break
+
+        operator = literal = None
+        if m := OPERATOR.match(text, pos):
+            operator = m.group(1)
+            pos = m.end()
+            if m := STRING.match(text, pos):
+                literal = unquote(m)
+            elif m := LITERAL.match(text, pos):
+                literal = LITERALS[m.group()] if m.group() in LITERALS else (int(m.group()) if INDEX.fullmatch(m.group()) else float(m.group()))
+            else:
+                raise ValueError(f"Literal expected at {pos}")
+            pos = m.end()
+        pos = skip_spaces(text, pos)
+        if not text.startswith(")", pos):
+            raise ValueError(f"')' expected at {pos}")
+        self.steps.append(("filter", (tuple(path), operator, literal)))
+        self.lookahead = max(self.lookahead, len(path))
+        return pos + 1
+
+
+    def closure(self, states: set) -> set:
+        """Adds the step after each "descend" step to the states (a descendant may be a direct child)
+        """
+        states = set(states)
+        for i in sorted(states):
+            while i < len(self.steps) and self.steps[i][0] == "descend":
+                i += 1
+                states.add(i)
+        return states
+
+
+    def advance(self, states: set, parent: object, key: object, value: object) -> set:
+        """Returns the states (indices of the next step to be matched) of the item (key, value) of parent,
+        whose states are given
+        """
+        next_states = set()
+        for i in states:
+            if i == len(self.steps):
+                continue
+            kind, arg = self.steps[i]
+            if kind == "descend":
+                next_states.add(i)
+            elif kind == "all" or kind == "name" and key == arg and type(parent) is dict:
+                next_states.add(i + 1)
+            elif kind == "index" and type(key) is int and key == (arg if arg >= 0 else arg + len(parent)):
+                next_states.add(i + 1)
+            elif kind == "slice" and type(key) is int and key in range(*arg.indices(len(parent))):
+                next_states.add(i + 1)
+            elif kind == "filter" and self.passes(value, *arg):
+                next_states.add(i + 1)
+        return self.closure(next_states) if next_states else next_states
+
+
+    def passes(self, value: object, path: tuple, operator: str, literal: object) -> bool:
+        for key in path:
+            if type(value) is dict and type(key) is str and key in value:
+                value = value[key]
+            elif type(value) in LISTS and type(key) is int and -len(value) <= key < len(value):
+                value = value[key]
+            else:
+                return False
+        return operator is None or compare(value, operator, literal)
+
+
+    def evaluate(self, obj: object, root: tuple = ()) -> list[tuple]:
+        """Returns the JSON paths of the matches in document order
+
+        Args:
+            obj (JSON-able object): Python object of the document
+            root (tuple, optional): JSON path of the subtree to be evaluated. Defaults to () (all).
+        """
+        states = self.closure({0})
+        value = obj
+        for key in root:
+            parent, value = value, value[key]
+            states = self.advance(states, parent, key, value)
+            if not states:
+                return []
+
+        matches = []
+        stack = [(root, value, states)]
+        while stack:
+            path, value, states = stack.pop()
+            if len(self.steps) in states:
+                matches.append(path)
+            children = []
+            for key, child in iter_items(value):
+                child_states = self.advance(states, value, key, child)
+                if child_states:
+                    children.append((path + (key, ), child, child_states))
+            stack.extend(reversed(children))
+        return matches
+
+
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def compile_query(text: str) -> Query:
+    """Returns the compiled Query of a query text (cached), see Query
+    """
+    return Query(text)
+
+
+def skip_spaces(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def unquote(m: re.Match) -> str:
+    """Returns the content of a quoted STRING match with its escapes resolved
+    """
+    s = m.group(1) if m.group(1) is not None else m.group(2)
+    return re.sub(r'\\(.)', r'\1', s)
+
+
+def precedes(obj: object, p: tuple, q: tuple) -> bool:
+    """Returns True, if the JSON path p comes before q in document order (depth first)
+    """
+    value = obj
+    for a, b in zip(p, q):
+        if a != b:
+            if type(value) is not dict:
+                return a < b
+            for key in value:
+                if key == a or key == b:
+                    return key == a
+            return False
+        value = value[a]
+    return len(p) < len(q)
+
+
+class QueryResults:
+    def __init__(self, query: Query, doc):
+        """Matches of a query in a document, that are updated incrementally, see update
+
+        Args:
+            query (Query): compiled query
+            doc (JSONDocument): document, whose changes are tracked, see JSONDocument.listeners
+        """
+        self.query = query
+        self.doc = doc
+        self.paths = query.evaluate(doc.obj)  # JSON paths of the matches in document order
+        self.changed = set()  # JSON paths of the changes since the last evaluation
+        doc.listeners.append(self.on_change)
+
+
+    def on_change(self, action: str, path: tuple, old: object, new: object) -> None:
+        if action == "rename":
+            if path:
+                self.changed.add(path[:-1])  # the dict, whose key has changed
+        else:
+            self.changed.add(path)
+
+
+    def update(self) -> list[tuple]:
+        """Re-evaluates the query only within the changed branches (incl. the ancestors, that a filter
+        may depend on) and returns the updated paths of the matches
+        """
+        if not self.changed:
+            return self.paths
+        roots = []
+        for path in sorted(self.changed, key=len):
+            root = path[:max(0, len(path) - self.query.lookahead)]
+            if not any(root[:len(r)] == r for r in roots):
+                roots.append(root)
+        self.changed.clear()
+
+        paths = [p for p in self.paths if not any(p[:len(r)] == r for r in roots)]
+        for root in roots:
+            lo, hi = 0, len(paths)
+            while lo < hi:  # binary search of the position of root in document order
+                mid = (lo + hi) // 2
+                if precedes(self.doc.obj, paths[mid], root):
+                    lo = mid + 1
+                else:
+                    hi = mid
+            paths[lo:lo] = self.query.evaluate(self.doc.obj, root)
+        self.paths = paths
+        return paths
+
+
+    def close(self) -> None:
+        """Stops tracking the document changes
+        """
+        if self.on_change in self.doc.listeners:
+            self.doc.listeners.remove(self.on_change)
@@ -0,0 +1,392 @@
+"""
+Source map of the JSON editor
+
+The SourceMap keeps the text of a loaded JSON file and the edits made since loading. A document is saved by
+copying the untouched regions of the source verbatim and splicing in only the edited values and renamed
+keys, which preserves the formatting (indentation, number notation, escapes) and keeps diffs minimal.
+
+The source offsets of the values are found by a structural scan, that only matches the brackets of nested
+containers (strings and scalars are skipped by a regex), without parsing them. The scan is done on demand, 
+only for the containers along the paths of the edits, and kept in an offset index.
+
+The MappedSource does the same scan on a memory-mapped file, such that files larger than the RAM can be
+viewed. Only the values of the containers, that are opened, are parsed. The LinesSource indexes the lines
+of a memory-mapped JSON Lines file, whose records are parsed on access.
+"""
+import codecs, json, mmap, os, re
+from array import array
+from json.decoder import WHITESPACE
+from compression import compression, iter_read
+
+
+NON_BRACKETS = re.compile(r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*')  # anything up to the next bracket
+LITERAL = re.compile(r'[^\s,]+')  # number, true, false or null within a list without strings and containers
+
+# bytes patterns for memory-mapped files
+WHITESPACE_BYTES = re.compile(rb'[ \t\n\r]*')
+NON_BRACKETS_BYTES = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*')
+STRING_BYTES = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+LITERAL_BYTES = re.compile(rb'[^\s,\]}]+')
+LINE_BYTES = re.compile(rb'[^\n]*\S')  # a line without line break and trailing whitespace, blank lines are skipped
+
+
+class SourceMap:
+    def __init__(self, text: str, encoding: str = "utf-8"):
+        """Source map of a JSON text
+
+        Args:
+            text (str): JSON text, that has been parsed into the document
+            encoding (str, optional): Encoding of the JSON file. Defaults to "utf-8".
+        """
+        self.text = text
+        self.encoding = encoding
+        self.offsets = {}  # source path of a container -> offsets of its children, see scan
+        self.edits = [False, None, {}]  # tree of nodes [replaced, source key or None, children] along the edits
+        self.scan_once = json.JSONDecoder().scan_once
+
+
+    def skip(self, idx: int) -> int:
+        """Returns the index of the next non-whitespace character
+        """
+        return WHITESPACE.match(self.text, idx).end()
+
+
+    def end(self, idx: int) -> int:
+        """Returns the end offset of the value, that starts at idx
+        """
+        text = self.text
+        if text[idx] not in "[{":
+            return self.scan_once(text, idx)[1]
+        depth = 0
+        while True:
+            idx = NON_BRACKETS.match(text, idx).end()
+            depth += 1 if text[idx] in "[{" else -1
+            idx += 1
+            if not depth:
+                return idx
+
+
+    def start(self, path: tuple) -> int:
+        """Returns the source offset of the value at the source path
+        """
+        if not path:
+            return self.skip(0)
+        offsets = self.scan(path[:-1])
+        if type(offsets) is dict:
+            return offsets[path[-1]][2]
+        return offsets[0][path[-1]]
+
+
+    def scan(self, path: tuple) -> object:
+        """Returns the source offsets of the children of the container at the source path. These are
+        {key: (key start, key end, value start, value end)} for a dict and (value starts, value ends) for a
+        list.
+        """
+        if path in self.offsets:
+            return self.offsets[path]
+
+        text, skip, scan_once, value_end = self.text, self.skip, self.scan_once, self.end
+        idx = self.start(path)
+        if text[idx] == "[":
+            stop = value_end(idx) - 1
+            if all(text.find(c, idx + 1, stop) < 0 for c in '"[{'):  # only literals, found in one regex pass
+                spans = [m.span() for m in LITERAL.finditer(text, idx + 1, stop)]
+                self.offsets[path] = (array("q", [start for start, _ in spans]), array("q", [end for _, end in spans]))
+                return self.offsets[path]
+
+        close = "}" if text[idx] == "{" else "]"
+        offsets = {} if close == "}" else (array("q"), array("q"))
+        idx = skip(idx + 1)
+        while text[idx] != close:
+            if close == "}":
+                key_start = idx
+                key, key_end = scan_once(text, key_start)
+                idx = skip(skip(key_end) + 1)  # skip the colon
+                end = value_end(idx)
+                offsets[key] = (key_start, key_end, idx, end)
+            else:
+                end = value_end(idx)
+                offsets[0].append(idx)
+                offsets[1].append(end)
+            idx = skip(end)
+            if text[idx] == ",":
+                idx = skip(idx + 1)
+        self.offsets[path] = offsets
+        return offsets
+
+
+    def on_change(self, action: str, path: tuple, old: object, new: object) -> None:
+        """Records an edit, see JSONDocument.listeners
+        """
+        if action == "rename" and not path:
+            return  # the root name is not part of the source
+
+        node = self.edits
+        for key in path[:-1] if action == "rename" else path:
+            if node[0]:
+                return  # within a replaced value, that is serialized as a whole
+            node = node[2].setdefault(key, [False, None, {}])
+        if node[0]:
+            return
+
+        if action == "rename":
+            child = node[2].pop(old, None) or [False, None, {}]
+            if child[1] is None:
+                child[1] = old  # the key in the source
+            elif child[1] == new:
+                child[1] = None  # renamed back
+            node[2][new] = child
+        else:
+            node[0] = True
+            node[2].clear()
+
+
+    def replacements(self, encode) -> list[tuple]:
+        """Returns the (start, end, text) replacements of the source, see iter_splice
+        """
+        replacements = []
+        stack = [((), (), self.edits)]
+        while stack:
+            path, source_path, node = stack.pop()
+            if not node[2]:
+                continue
+            offsets = self.scan(source_path)
+            for key, child in node[2].items():
+                source_key = key if child[1] is None else child[1]
+                if type(offsets) is dict:
+                    key_start, key_end, start, end = offsets[source_key]
+                    if child[1] is not None:
+                        replacements.append((key_start, key_end, json.dumps(key)))
+                else:
+                    start, end = offsets[0][key], offsets[1][key]
+                if child[0]:
+                    replacements.append((start, end, encode(path + (key, ))))
+                else:
+                    stack.append((path + (key, ), source_path + (source_key, ), child))
+        return sorted(replacements)
+
+
+    def iter_splice(self, encode, chunk_size: int = 1 << 20):
+        """Yields (chunk, progress) of the source with the edits spliced in, see iterencode
+
+        Args:
+            encode (callable): Returns the JSON text of the current value at a JSON path of the document
+            chunk_size (int, optional): Max. length of the chunks copied from the source. Defaults to 1 MB.
+        """
+        if self.edits[0]:  # the whole document has been replaced
+            yield encode(()), 1.0
+            return
+
+        text, pos = self.text, 0
+        for start, end, value in self.replacements(encode) + [(len(text), len(text), "")]:
+            for i in range(pos, start, chunk_size):
+                yield text[i:min(i + chunk_size, start)], i / len(text)
+            yield value, start / len(text)
+            pos = end
+
+
+class Unparsed:
+    """Stand-in for a dict or list of a memory-mapped file, whose children have not been parsed
+    """
+    __slots__ = ("tag", "empty")
+
+    def __init__(self, tag: str, empty: bool):
+        self.tag = tag      # "dict" or "list"
+        self.empty = empty
+
+
+class MappedList:
+    """Read-only sequence of the items of a list in a memory-mapped file, that are parsed on access
+    """
+    def __init__(self, item, length: int):
+        self.item = item  # callable, that returns the parsed item i
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, i: int) -> object:
+        return self.item(i)
+
+
+def map_file(fp: str) -> mmap.mmap:
+    """Returns the read-only memory map of a file (empty bytes for an empty file, that can't be mapped).
+    Compressed files can't be mapped, these are decompressed into memory.
+    """
+    if compression(fp):
+        return bytearray().join(chunk for chunk, _ in iter_read(fp, 1 << 20))
+    if not os.path.getsize(fp):
+        return b""
+    with open(fp, "rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class MappedSource:
+    def __init__(self, fp: str):
+        """Memory-mapped JSON file (UTF-8) with an offset index of the scanned containers
+
+        Args:
+            fp (str): file path
+        """
+        self.data = map_file(fp)
+        if json.detect_encoding(self.data[:4]) not in ("utf-8", "utf-8-sig"):
+            raise ValueError(f"'{fp}' is not UTF-8 encoded")
+        self.offsets = {}  # path of a container -> offsets of its children, see scan
+        self.root = None   # (start, end) offsets of the root value
+
+
+    def skip(self, idx: int) -> int:
+        """Returns the index of the next non-whitespace byte
+        """
+        return WHITESPACE_BYTES.match(self.data, idx).end()
+
+
+    def end(self, idx: int, progress=None) -> int:
+        """Returns the end offset of the value, that starts at idx
+
+        Args:
+            idx (int): start offset of the value
+            progress (callable, optional): Called with the progress (0..1) along the file. Defaults to None.
+        """
+        data = self.data
+        if data[idx] == ord('"'):
+            return STRING_BYTES.match(data, idx).end()
+        if data[idx] not in b"[{":
+            return LITERAL_BYTES.match(data, idx).end()
+        depth, percent = 0, 0
+        while True:
+            idx = NON_BRACKETS_BYTES.match(data, idx).end()
+            depth += 1 if data[idx] in b"[{" else -1
+            idx += 1
+            if not depth:
+                return idx
+            if progress and 100 * idx // len(data) > percent:
+                percent = 100 * idx // len(data)
+                progress(percent / 100)
+
+
+    def start(self) -> int:
+        """Returns the start offset of the root value
+        """
+        return self.skip(len(codecs.BOM_UTF8) if self.data[:3] == codecs.BOM_UTF8 else 0)
+
+
+    def span(self, path: tuple, progress=None) -> tuple[int, int]:
+        """Returns the (start, end) offsets of the value at the JSON path (see end for progress)
+        """
+        if not path:
+            if self.root is None:  # matches the brackets of the whole file once
+                self.root = self.start(), self.end(self.start(), progress)
+            return self.root
+        offsets = self.scan(path[:-1])
+        if type(offsets) is dict:
+            return offsets[path[-1]]
+        return offsets[0][path[-1]], offsets[1][path[-1]]
+
+
+    def scan(self, path: tuple, progress=None) -> object:
+        """Returns the offsets of the children of the container at the JSON path. These are
+        {key: (value start, value end)} for a dict and (value starts, value ends) for a list.
+
+        Args:
+            path (tuple): JSON path of a dict or list
+            progress (callable, optional): Called with the progress (0..1) of the scan. Defaults to None.
+        """
+        if path in self.offsets:
+            return self.offsets[path]
+
+        data, skip, value_end = self.data, self.skip, self.end
+        start, stop = self.span(path, progress=progress and (lambda fraction: progress(fraction / 2)))
+        if data[start] == ord("[") and all(data.find(c, start + 1, stop) < 0 for c in (b'"', b"[", b"{")):
+            spans = [m.span() for m in LITERAL_BYTES.finditer(data, start + 1, stop - 1)]
+            self.offsets[path] = (array("q", [i for i, _ in spans]), array("q", [j for _, j in spans]))
+            return self.offsets[path]
+
+        close = ord("}") if data[start] == ord("{") else ord("]")
+        offsets = {} if close == ord("}") else (array("q"), array("q"))
+        idx, percent = skip(start + 1), 0
+        while data[idx] != close:
+            if close == ord("}"):
+                key_end = STRING_BYTES.match(data, idx).end()
+                key = json.loads(data[idx:key_end])
+                idx = skip(skip(key_end) + 1)  # skip the colon
+                end = value_end(idx)
+                offsets[key] = (idx, end)
+            else:
+                end = value_end(idx)
+                offsets[0].append(idx)
+                offsets[1].append(end)
+            idx = skip(end)
+            if data[idx] == ord(","):
+                idx = skip(idx + 1)
+            if progress and 100 * (idx - start) // (stop - start) > percent:
+                percent = 100 * (idx - start) // (stop - start)
+                progress(0.5 + percent / 200)
+        self.offsets[path] = offsets
+        return offsets
+
+
+    def value(self, start: int, end: int) -> object:
+        """Returns the scalar value at the offsets or an Unparsed stand-in for a dict or list
+        """
+        first = self.data[start]
+        if first in b"[{":
+            return Unparsed("dict" if first == ord("{") else "list", self.data[self.skip(start + 1)] in b"]}")
+        return json.loads(self.data[start:end])
+
+
+    def parse(self, path: tuple) -> object:
+        """Parses the (whole) value at the JSON path
+        """
+        start, end = self.span(path)
+        return json.loads(self.data[start:end])
+
+
+class LinesSource:
+    def __init__(self, fp: str, progress=None):
+        """Memory-mapped JSON Lines file (UTF-8) with the offsets of its (non-blank) lines
+
+        Args:
+            fp (str): file path
+            progress (callable, optional): Called with the progress (0..1) of indexing the lines.
+                Defaults to None.
+        """
+        self.fp = fp
+        self.data = map_file(fp)
+        self.closed = False  # the memory map has been released, see close
+        self.starts, self.ends = array("q"), array("q")
+        percent = 0
+        for m in LINE_BYTES.finditer(self.data):
+            self.starts.append(m.start())
+            self.ends.append(m.end())
+            if progress and not len(self.starts) % 10000 and 100 * m.end() // len(self.data) > percent:
+                percent = 100 * m.end() // len(self.data)
+                progress(percent / 100)
+
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+    def parse(self, i: int) -> object:
+        """Parses the record of line i
+        """
+        return json.loads(self.data[self.starts[i]:self.ends[i]])
+
+
+    def close(self) -> None:
+        """Releases the memory map, like before the file is replaced (a mapped file can't be replaced on 
+        Windows). The lines can't be parsed anymore.
+        """
+        if type(self.data) is mmap.mmap:
+            self.data.close()
+        self.closed = True
+
+
+def parse_lines(fp: str, start: int, stop: int) -> list:
+    """Parses the records of the (whole) lines from start to stop of a JSON Lines file, see map_parallel
+    """
+    with open(fp, "rb") as file:
+        file.seek(start)
+        data = file.read(stop - start)
+    return [json.loads(m.group()) for m in LINE_BYTES.finditer(data)]
@@ -0,0 +1,156 @@
+"""
+Search index of the JSON editor
+
+The SearchIndex is an inverted index mapping the (lower case) field names and stringified values of a
+JSON document to the JSON paths of their nodes. Search queries are answered from the index, without
+walking the document or the Treeview.
+"""
+import itertools
+from array import array
+
+from json_scan import MappedList
+
+
+def iter_items(value: object):
+    """Returns an iterable of (key, value) of a dict or list (incl. compact arrays and the records of 
+    JSON Lines files), empty for others (like the Unparsed branches of a MappedDocument)
+    """
+    if type(value) is dict:
+        return value.items()
+    if type(value) in (list, array, MappedList):
+        return enumerate(value)
+    return ()
+
+
+class SearchIndex:
+    def __init__(self, obj: object, progress=None):
+        """Builds the search index of a JSON object
+
+        Args:
+            obj (JSON-able object): Python object of the document
+            progress (callable, optional): Called with the progress (0..1) along the top level items.
+                Defaults to None.
+        """
+        self.keys = {}    # field name term -> {path: None}
+        self.values = {}  # value term -> {path: None}
+        self.nodes = {}   # path -> (position in the document, value term or None)
+        self.positions = itertools.count()
+        self.build(obj, progress)
+
+
+    def build(self, obj: object, progress=None) -> None:
+        self.keys.clear()
+        self.values.clear()
+        self.nodes.clear()
+        self.positions = itertools.count()
+        self.add((), obj)
+        if type(obj) not in (dict, list):
+            return
+
+        percent = 0
+        for i, (key, value) in enumerate(iter_items(obj), start=1):
+            self.add_subtree((key, ), value)
+            if progress and 100 * i // len(obj) > percent:
+                percent = 100 * i // len(obj)
+                progress(percent / 100)
+
+
+    def add_subtree(self, path: tuple, value: object) -> None:
+        """Adds a node and its children depth first (in document order)
+        """
+        stack = [(path, value)]
+        while stack:
+            path, value = stack.pop()
+            self.add(path, value)
+            if type(value) in (dict, list):
+                stack.extend(reversed([(path + (key, ), val) for key, val in iter_items(value)]))
+
+
+    def add(self, path: tuple, value: object, position: int = None) -> None:
+        """Adds a single node (without children)
+        """
+        term = None if type(value) in (dict, list, array) else str(value).lower()  # array items aren't indexed
+        self.insert(path, position if position is not None else next(self.positions), term)
+
+
+    def insert(self, path: tuple, position: int, term: str) -> None:
+        self.nodes[path] = (position, term)
+        if path and type(path[-1]) is str:  # list indices are not indexed
+            self.keys.setdefault(path[-1].lower(), {})[path] = None
+        if term is not None:
+            self.values.setdefault(term, {})[path] = None
+
+
+    def remove(self, path: tuple) -> tuple:
+        """Removes a single node (without children) and returns its (position, value term)
+        """
+        position, term = self.nodes.pop(path)
+        if path and type(path[-1]) is str:
+            self.discard(self.keys, path[-1].lower(), path)
+        if term is not None:
+            self.discard(self.values, term, path)
+        return position, term
+
+
+    def discard(self, terms: dict, term: str, path: tuple) -> None:
+        paths = terms.get(term, {})
+        paths.pop(path, None)
+        if not paths:
+            terms.pop(term, None)
+
+
+    def subtree(self, path: tuple) -> list[tuple]:
+        """Returns the indexed paths of the subtree at path (incl. path)
+        """
+        n = len(path)
+        return [p for p in self.nodes if p[:n] == path]
+
+
+    def on_change(self, action: str, path: tuple, old: object, new: object) -> None:
+        """Updates the index on document changes, see JSONDocument.listeners
+        """
+        if action == "rename":
+            if not path:
+                return  # the root name is not indexed
+            new_path = path[:-1] + (new, )
+            for p in self.subtree(path):
+                position, term = self.remove(p)
+                self.insert(new_path + p[len(path):], position, term)
+
+        elif type(old) in (dict, list) or type(new) in (dict, list):
+            position = self.nodes[path][0] if path in self.nodes else None
+            for p in self.subtree(path):
+                self.remove(p)
+            self.add(path, new, position)
+            for key, value in iter_items(new) if type(new) in (dict, list) else ():
+                self.add_subtree(path + (key, ), value)
+
+        elif path in self.nodes:  # not for the items of compact arrays
+            position, term = self.remove(path)
+            self.add(path, new, position)
+
+
+    def search(self, query: str) -> list[tuple]:
+        """Searches field names and values. A query in double quotes must match a field name or value
+        exactly, otherwise it's a case insensitive substring search.
+
+        Args:
+            query (str): search text
+
+        Returns:
+            list[tuple]: JSON paths of the matching nodes in document order
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        if len(query) > 1 and query[0] == query[-1] == '"':
+            query = query[1:-1]
+            terms = [terms[query] for terms in (self.keys, self.values) if query in terms]
+        else:
+            terms = [paths for terms in (self.keys, self.values) for term, paths in terms.items() if query in term]
+
+        matches = set()
+        for paths in terms:
+            matches.update(paths)
+        return sorted(matches, key=lambda path: self.nodes[path][0])
@@ -0,0 +1,181 @@
+"""
+Columnar tables of the JSON editor
+
+A list of dicts, that all have the same keys (like one result per lane), is a table: the keys are its
+columns and the items its rows. A ColumnTable stores the values of a table column-wise, int and float
+columns as typed arrays (NumPy arrays, if NumPy is installed), such that sorting and filtering by a column
+run in C instead of a Python walk of the rows. The table follows the changes of its JSONDocument. NumPy is
+imported, when the first table is built, not with the editor.
+"""
+import functools, itertools, json, operator
+from array import array
+
+from json_query import OPERATOR, compare
+from json_scan import MappedList
+
+
+OPERATORS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+@functools.lru_cache(maxsize=None)
+def import_numpy() -> object:
+    """Returns the numpy module, None if it isn't installed (optional, the typed columns are array('q') 
+    and array('d') then)
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def table_keys(value: object) -> tuple:
+    """Returns the keys of a table (a list of at least 2 dicts with the same keys) in the order of the first
+    row, None if the value isn't a table
+    """
+    if type(value) not in (list, MappedList) or len(value) < 2 or type(value[0]) is not dict:
+        return None
+    keys = value[0].keys()
+    if not keys or not all(type(row) is dict and row.keys() == keys for row in value):
+        return None
+    return tuple(keys)
+
+
+def make_column(values: list) -> object:
+    """Returns the values of a column as typed array, if they are all int or all float, else as list
+    """
+    kinds = set(map(type, values))
+    if kinds == {int} or kinds == {float}:
+        numpy = import_numpy()
+        try:
+            if numpy:
+                return numpy.array(values, dtype=numpy.int64 if kinds == {int} else numpy.float64)
+            return array("q" if kinds == {int} else "d", values)
+        except OverflowError:
+            pass  # int, that doesn't fit into 64 bit
+    return values
+
+
+def is_typed(column: object) -> bool:
+    return type(column) is not list
+
+
+def parse_condition(text: str) -> tuple:
+    """Parses a filter condition like "> 0.5", "== PRBS31" or "!= 'a b'" into (operator, value). The
+    value is a JSON literal or else the text.
+
+    Raises:
+        ValueError: the condition doesn't start with an operator
+    """
+    m = OPERATOR.match(text)
+    if not m:
+        raise ValueError("A condition starts with ==, !=, <, <=, > or >=")
+    literal = text[m.end():].strip()
+    try:
+        value = json.loads(literal.replace("'", '"') if literal.startswith("'") else literal)
+    except ValueError:
+        value = literal
+    return m.group(1), value
+
+
+class ColumnTable:
+    def __init__(self, doc, path: tuple):
+        """Column store of the table at the JSON path of a document, see table_keys
+
+        Args:
+            doc (JSONDocument): document, whose changes are followed, see JSONDocument.listeners
+            path (tuple): JSON path of the table
+
+        Raises:
+            ValueError: the value at path isn't a table
+        """
+        self.doc = doc
+        self.path = path
+        rows = doc.get(path)
+        self.keys = table_keys(rows)
+        if self.keys is None:
+            raise ValueError("Not a list of dicts with the same keys")
+        rows = list(rows)  # parses the records of a JSON Lines document once
+        self.numpy = import_numpy()
+        self.columns = {key: make_column([row[key] for row in rows]) for key in self.keys}
+        self.length = len(rows)
+        self.stale = False  # the rows or keys have changed, the table needs to be built again
+        doc.listeners.append(self.on_change)
+
+
+    def __len__(self) -> int:
+        return self.length
+
+
+    def value(self, row: int, key: str) -> object:
+        value = self.columns[key][row]
+        return value.item() if self.numpy and isinstance(value, self.numpy.generic) else value
+
+
+    def on_change(self, action: str, path: tuple, old: object, new: object) -> None:
+        """Updates the cell of a changed value, a change of the rows or keys makes the table stale
+        """
+        n = len(self.path)
+        if path[:n] != self.path and path != self.path[:len(path)]:
+            return  # another branch
+        if action == "set" and len(path) == n + 2 and path[-1] in self.columns:
+            column = self.columns[path[-1]]
+            if type(column) is list:
+                column[path[-2]] = new
+                return
+            if type(new) is type(self.value(path[-2], path[-1])):
+                try:
+                    column[path[-2]] = new
+                    return
+                except OverflowError:
+                    pass
+        if action == "set" and len(path) > n + 2:
+            return  # a value within a cell (containers are not part of the column stores)
+        self.stale = True
+
+
+    def sort(self, key: str, descending: bool = False) -> list[int]:
+        """Returns the row indices in the order of the column (stable, values of other types than the
+        numbers and strings come last)
+        """
+        column = self.columns[key]
+        if is_typed(column):
+            order = self.numpy.argsort(column, kind="stable") if self.numpy else sorted(range(self.length), key=column.__getitem__)
+        else:
+            try:
+                order = sorted(range(self.length), key=column.__getitem__)
+            except TypeError:  # mixed types
+                order = sorted(range(self.length), key=lambda i: sort_key(column[i]))
+        if descending:
+            order = order[::-1] if self.numpy and is_typed(column) else list(reversed(order))
+        return order
+
+
+    def filter(self, rows, key: str, condition: tuple) -> list[int]:
+        """Returns the rows (indices in the order given), whose values of the column pass the condition,
+        see parse_condition. Numbers are compared with numbers, strings with strings, like a query filter.
+        """
+        op, literal = condition
+        column = self.columns[key]
+        if is_typed(column) and type(literal) in (int, float):
+            if self.numpy:
+                rows = self.numpy.asarray(rows, dtype=self.numpy.int64)
+                return rows[OPERATORS[op](column[rows], literal)]
+            mask = bytearray(map(OPERATORS[op], column, itertools.repeat(literal, self.length)))
+            return list(itertools.compress(rows, map(mask.__getitem__, rows)))
+        return [row for row in rows if compare(column[row] if type(column) is list else self.value(row, key), op, literal)]
+
+
+    def close(self) -> None:
+        if self.on_change in self.doc.listeners:
+            self.doc.listeners.remove(self.on_change)
+
+
+def sort_key(value: object) -> tuple:
+    """Sort key of the values of mixed types: numbers, strings, then the others by their repr
+    """
+    if type(value) in (int, float):
+        return (0, value, "")
+    if type(value) is str:
+        return (1, 0, value)
+    return (2, 0, repr(value))
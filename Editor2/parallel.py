@@ -0,0 +1,61 @@
+"""
+Parallel parsing for the JSON editor
+
+Parsing is CPU bound and json.loads holds the GIL, hence several files or the chunks of a large JSON Lines
+file are parsed in a ProcessPoolExecutor, one worker process per core. The worker processes are spawned
+(not forked), because the editor process runs the Tkinter main loop and background threads.
+
+Building large acyclic structures (parsed JSON, search indexes) triggers repeated full collections of the
+cyclic garbage collector, that take longer than the building itself. These run within gc_paused.
+"""
+import contextlib, gc, os
+
+
+@contextlib.contextmanager
+def gc_paused():
+    """Context, that pauses the cyclic garbage collector
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def map_parallel(func, args_list: list, progress=None) -> list:
+    """Runs func(*args) for each args of args_list in worker processes and returns the results in order.
+    A single call, or all calls on a single core, are run in the current process.
+
+    Args:
+        func (callable): Function to be run, it must be importable by the worker processes
+        args_list (list): Positional arguments per call
+        progress (callable, optional): Called with the progress (0..1) when a call is finished. If it
+            raises an exception (like TaskCancelled), the pending calls are cancelled. Defaults to None.
+
+    Returns:
+        list: results of the calls in the order of args_list
+    """
+    workers = min(len(args_list), os.cpu_count() or 1)
+    if workers <= 1:
+        results = []
+        for args in args_list:
+            results.append(func(*args))
+            if progress:
+                progress(len(results) / len(args_list))
+        return results
+
+    import multiprocessing  # imported on first use, for a fast startup of the editor
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(func, *args) for args in args_list]
+        try:
+            for n, future in enumerate(as_completed(futures), start=1):
+                future.result()  # raises the exception of a failed call
+                if progress:
+                    progress(n / len(futures))
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        return [future.result() for future in futures]
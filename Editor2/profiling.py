@@ -0,0 +1,126 @@
+"""
+Timing instrumentation of the JSON editor
+
+The Instrumentation times the phases of the editor (like parse, insert, expand, extract, save) and counts
+their tree nodes and Tcl calls. Each finished phase is logged as one JSON line to the "json_editor" logger
+and passed to the listeners, like the status bar of the JSONTreeFrame. A phase costs two perf_counter
+calls, the Tcl calls of a widget are counted by a proxy of its Tcl interpreter, see TclCounter.
+
+profile_session wraps a whole session in cProfile (opt-in) and dumps the stats on exit.
+"""
+import contextlib, json, logging, sys, time
+
+
+PROFILE_LINES = 30  # number of functions of the profile, that are printed on exit
+
+logger = logging.getLogger("json_editor")
+
+
+class TclCounter:
+    def __init__(self, tk):
+        """Proxy of a Tcl interpreter (widget.tk), that counts the Tcl calls of the widget
+
+        Args:
+            tk (tkapp): Tcl interpreter of the widget
+        """
+        self.tk = tk
+        self.calls = 0
+
+
+    def call(self, *args):
+        self.calls += 1
+        return self.tk.call(*args)
+
+
+    def __getattr__(self, name: str):
+        return getattr(self.tk, name)
+
+
+class Instrumentation:
+    def __init__(self):
+        """Phase timers and counters, see the module docstring
+        """
+        self.tcl = None       # TclCounter of the instrumented widget, see count_tcl_calls
+        self.listeners = []   # called with the record of each finished phase
+
+
+    def count_tcl_calls(self, widget) -> None:
+        """Counts the Tcl calls of the widget (and of its child widgets created later)
+        """
+        self.tcl = TclCounter(widget.tk)
+        widget.tk = self.tcl
+
+
+    def start(self, phase: str, **fields) -> dict:
+        """Starts timing a phase, that may span several callbacks of the main loop
+
+        Args:
+            phase (str): name of the phase, like "parse"
+            fields: further fields of the record, like nodes=0 to be counted by the caller
+
+        Returns:
+            dict: record of the phase to be passed to stop
+        """
+        record = {"phase": phase, **fields}
+        record["tcl_calls"] = self.tcl.calls if self.tcl else 0
+        record["start"] = time.perf_counter()
+        return record
+
+
+    def stop(self, record: dict, **fields) -> dict:
+        """Finishes a phase: its record gets the time [s] and the number of Tcl calls, is logged and passed
+        to the listeners
+        """
+        record["time"] = time.perf_counter() - record.pop("start")
+        record["tcl_calls"] = self.tcl.calls - record["tcl_calls"] if self.tcl else 0
+        record.update(fields)
+        logger.info(json.dumps(record))
+        for listener in self.listeners:
+            listener(record)
+        return record
+
+
+    @contextlib.contextmanager
+    def phase(self, phase: str, **fields):
+        """Context, that times a phase within one callback, see start and stop. Yields the record.
+        """
+        record = self.start(phase, **fields)
+        try:
+            yield record
+        finally:
+            self.stop(record)
+
+
+def format_phase(record: dict) -> str:
+    """Returns the status text of a phase record, like "insert 1.20 s, 10045 nodes, 10046 Tcl calls"
+    """
+    text = f"{record['phase']} {record['time']:.3g} s"
+    if "nodes" in record:
+        text += f", {record['nodes']} nodes"
+    if record.get("tcl_calls"):
+        text += f", {record['tcl_calls']} Tcl calls"
+    if record.get("error"):
+        text += ", failed"
+    return text
+
+
+@contextlib.contextmanager
+def profile_session(fp: str = None):
+    """Context, that profiles the code with cProfile, if a file path is given (no overhead otherwise). On
+    exit the stats are dumped to the file (see pstats) and the top PROFILE_LINES functions are printed to
+    stderr.
+    """
+    if not fp:
+        yield
+        return
+    import cProfile, io, pstats  # only imported, if profiled
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(fp)
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        print(stream.getvalue(), file=sys.stderr)
@@ -0,0 +1,87 @@
+"""
+Synthetic JSON documents for the benchmarks
+
+Each generator returns a JSON-able object with about n tree nodes (a node is a dict, a list or a scalar,
+like a row of the Treeview). The documents are deterministic (seeded), such that the runs of different
+commits are comparable.
+"""
+import json, os, random
+
+
+SEED = 42         # seed of the random values
+DEEP_DEPTH = 100  # nesting depth of the "deep" documents (below the recursion limit of Editor1)
+ARRAY_LENGTH = 1000  # length of the number lists of the "arrays" documents
+PATTERNS = ["PRBS7", "PRBS31", "fast-clock", "slow-clock"]  # like combo_choice.json
+
+
+def deep(n: int) -> object:
+    """List of chains of DEEP_DEPTH nested dicts, each ending in a few scalars
+    """
+    rnd = random.Random(SEED)
+    chains = []
+    for i in range(max(1, n // (DEEP_DEPTH + 3))):
+        value = {"id": i, "value": rnd.random()}
+        for level in range(DEEP_DEPTH):
+            value = {f"level{level}": value}
+        chains.append(value)
+    return chains
+
+
+def wide(n: int) -> object:
+    """Single dict with n - 1 scalar items
+    """
+    rnd = random.Random(SEED)
+    return {f"key{i:07d}": rnd.choice([rnd.randint(0, 1000), rnd.random(), rnd.choice(PATTERNS)]) for i in range(n - 1)}
+
+
+def arrays(n: int) -> object:
+    """Dict of long homogeneous int and float lists, like measured waveforms
+    """
+    rnd = random.Random(SEED)
+    count = max(1, n // (ARRAY_LENGTH + 1))
+    return {f"waveform{i}": [rnd.random() for _ in range(ARRAY_LENGTH)] if i % 2 else [rnd.randint(-1000, 1000) for _ in range(ARRAY_LENGTH)]
+            for i in range(count)}
+
+
+def mixed(n: int) -> object:
+    """Result file like: a meta dict and a list of lane records with all JSON types
+    """
+    rnd = random.Random(SEED)
+    lanes = [{"lane": i, "pattern": rnd.choice(PATTERNS), "ber": rnd.random() * 1e-6, "ok": rnd.random() > 0.1,
+              "comment": None, "eye": {"width": rnd.random(), "height": rnd.random()}, "vals": [rnd.randint(0, 1000) for _ in range(8)]}
+             for i in range(max(1, n // 18))]
+    return {"meta": {"name": "benchmark", "seed": SEED, "pattern": "PRBS7"}, "lanes": lanes}
+
+
+SHAPES = {"deep": deep, "wide": wide, "arrays": arrays, "mixed": mixed}
+
+
+def count_nodes(obj: object) -> int:
+    """Returns the number of tree nodes of a JSON-able object
+    """
+    count = 0
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        count += 1
+        if type(value) is dict:
+            stack.extend(value.values())
+        elif type(value) is list:
+            stack.extend(value)
+    return count
+
+
+def generate_file(shape: str, n: int, data_dir: str) -> tuple[str, int]:
+    """Writes the document of the shape with about n nodes to data_dir, unless it exists
+
+    Returns:
+        tuple[str, int]: file path and number of nodes
+    """
+    fp = os.path.join(data_dir, f"{shape}-{n}.json")
+    obj = SHAPES[shape](n)
+    if not os.path.exists(fp):
+        os.makedirs(data_dir, exist_ok=True)
+        with open(fp + ".tmp", "w") as file:
+            json.dump(obj, file)
+        os.replace(fp + ".tmp", fp)
+    return fp, count_nodes(obj)
@@ -0,0 +1,324 @@
+"""
+Headless benchmarks of the JSONTreeFrame of Editor1 and Editor2
+
+Drives each editor programmatically (the file dialogs are bypassed) on synthetic documents (see
+generators.py) under a virtual X server (Xvfb) and records the wall time and the peak memory of the
+phases load, get_all_children, expand, edit, extract and save into a JSON report. A report can be stored
+as baseline, later runs are compared to it and the phases, that are slower by more than the threshold,
+are flagged (exit code 1). The startup of Editor2 (python Editor2/Editor2.py --first-frame, from the process
+start to the first drawn frame) is measured too and must stay within a fixed budget.
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --report report.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.2
+
+Each editor, shape and size runs in a fresh worker process (twice: the times are measured without and the
+peak memory with tracemalloc, that slows down Python code), hence the runs don't affect each other.
+"""
+import argparse, contextlib, datetime, gc, importlib, json, os, platform, shutil, subprocess, sys, tempfile, time, tracemalloc
+
+import generators
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # repository with Editor1/ and Editor2/
+EDITORS = ["Editor1", "Editor2"]
+SIZES = [10**3, 10**4, 10**5, 10**6]  # approx. number of tree nodes of the documents
+PHASES = ["load", "get_all_children", "expand", "edit", "extract", "save"]
+EDITS = 1000            # number of edited cells in the edit phase
+THRESHOLD = 0.2         # a phase, that is slower than the baseline by more than this fraction, is a regression
+MIN_DIFFERENCE = 0.005  # s, smaller slowdowns are noise and never a regression
+TIMEOUT = 3600          # s, max. time of a worker process
+DISPLAY = ":99"         # display of the virtual X server
+XVFB_STARTUP = 5.0      # s, max. time to wait for the virtual X server
+STARTUP_BUDGET = 1.0    # s, max. time of Editor2 from the process start to the first frame
+
+
+@contextlib.contextmanager
+def virtual_display(display: str = DISPLAY):
+    """Context with a virtual X server (Xvfb) as DISPLAY of the worker processes
+    """
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        raise SystemExit("Xvfb not found, install it (like the xvfb package) or run with --display")
+    process = subprocess.Popen([xvfb, display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    socket = f"/tmp/.X11-unix/X{display.lstrip(':').split('.')[0]}"
+    deadline = time.monotonic() + XVFB_STARTUP
+    while not os.path.exists(socket):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise SystemExit(f"Xvfb could not be started on {display}")
+        time.sleep(0.05)
+    previous = os.environ.get("DISPLAY")
+    os.environ["DISPLAY"] = display
+    try:
+        yield
+    finally:
+        process.terminate()
+        process.wait()
+        if previous is None:
+            del os.environ["DISPLAY"]
+        else:
+            os.environ["DISPLAY"] = previous
+
+
+def wait_idle(root, frame) -> None:
+    """Runs the Tk event loop until the background task and the tree insertion of Editor2 are done and the
+    tree is drawn
+    """
+    while getattr(frame, "task", None) or getattr(frame, "insertion", None):
+        root.update()
+        time.sleep(0.001)
+    root.update()
+
+
+def edit_cells(module, frame, nodes: list[str]) -> None:
+    """Edits the numbers of the tree nodes through the popup code of the editor (without placing the popup)
+    """
+    if hasattr(frame, "doc"):  # Editor2: the popup changes the document, that updates the tree
+        for node in nodes:
+            path = frame.doc.iids[node]
+            popup = module.EntryPopup(frame.tree, frame.doc, path, "#1", frame.doc.get(path))
+            popup.delete(0, "end")
+            popup.insert(0, str(frame.doc.get(path) + 1))
+            popup.update()
+    else:  # Editor1: the popup changes the tree on focus out
+        for node in nodes:
+            entry = module.ttk.Entry(frame.tree_frame)
+            entry.editing_node, entry.editing_region = node, "cell"
+            entry.insert(0, str(frame.tree.item(node, "values")[0] + 1))
+            frame.on_focus_out(argparse.Namespace(widget=entry))
+
+
+def number_nodes(frame) -> list[str]:
+    """Returns up to EDITS tree nodes of int or float values, evenly spread over the tree
+    """
+    nodes = [node for node in frame.get_all_children()
+             if frame.tree.tag_has("int", node) or frame.tree.tag_has("float", node)]
+    step = max(1, len(nodes) // EDITS)
+    return nodes[::step][:EDITS]
+
+
+def run_worker(editor: str, fp: str, lazy: bool, trace_memory: bool) -> dict:
+    """Runs the phases with the JSONTreeFrame of the editor on the file in this process
+
+    Returns:
+        dict: phase -> {"time": s} or {"peak_memory": bytes} (trace_memory) or {"error": message}, the phases
+            after an error are skipped
+    """
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
+
+    sys.path.insert(0, os.path.join(ROOT, editor))
+    module = importlib.import_module(editor)
+    out_dir = tempfile.mkdtemp(prefix="json_editor_benchmark_")
+    out_fp = os.path.join(out_dir, "saved.json")
+    work_fp = os.path.join(out_dir, os.path.basename(fp))  # a copy, such that an edit log or autosave can't change the data
+    shutil.copyfile(fp, work_fp)
+    filedialog.askopenfilename = lambda **kwargs: work_fp
+    filedialog.askopenfilenames = lambda **kwargs: (work_fp, )
+    filedialog.asksaveasfilename = lambda **kwargs: out_fp
+
+    def fail(title=None, message=None, **kwargs):
+        raise RuntimeError(message)
+    messagebox.showwarning = messagebox.showinfo = messagebox.showerror = fail
+    messagebox.askyesno = lambda **kwargs: False  # no replay of an edit log
+
+    root = tk.Tk()
+    root.geometry("1000x800")
+    frame = module.JSONTreeFrame(root, lazy=lazy)
+    root.update()
+    nodes = []
+    phases = {
+        "load": lambda: (frame.load_json_file(), wait_idle(root, frame)),
+        "get_all_children": frame.get_all_children,
+        "expand": lambda: (frame.expand_tree(), wait_idle(root, frame)),
+        "edit": lambda: (edit_cells(module, frame, nodes), wait_idle(root, frame)),
+        "extract": frame.extract_obj_from_tree,
+        "save": lambda: (frame.save_json_file(), wait_idle(root, frame)),
+    }
+    results = {}
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        for phase in PHASES:
+            if phase == "edit":
+                nodes = number_nodes(frame)
+            gc.collect()
+            if trace_memory:
+                tracemalloc.reset_peak()
+                start = tracemalloc.get_traced_memory()[0]
+            t = time.perf_counter()
+            try:
+                phases[phase]()
+            except Exception as e:  # like RecursionError of Editor1 on deep documents
+                results[phase] = {"error": f"{type(e).__name__}: {e}"}
+                break
+            elapsed = time.perf_counter() - t
+            results[phase] = {"peak_memory": tracemalloc.get_traced_memory()[1] - start} if trace_memory else {"time": elapsed}
+    finally:
+        if hasattr(frame, "close_edit_log"):
+            frame.close_edit_log()
+        root.destroy()
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return results
+
+
+def run_case(editor: str, fp: str, lazy: bool, repeat: int, timeout: float) -> dict:
+    """Runs the phases of an editor on a file in worker processes, repeat times for the times (the minimum
+    is reported) and once for the peak memory
+
+    Returns:
+        dict: phase -> {"time": s, "peak_memory": bytes} or {"error": message}
+    """
+    runs = [False] * repeat + [True]  # trace_memory
+    results = {}
+    for trace_memory in runs:
+        command = [sys.executable, os.path.abspath(__file__), "--worker", editor, fp] + ["--lazy"] * lazy + ["--trace-memory"] * trace_memory
+        try:
+            process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+            lines = process.stdout.strip().splitlines()
+            worker = json.loads(lines[-1]) if process.returncode == 0 and lines else {"worker": {"error": process.stderr.strip()[-500:]}}
+        except subprocess.TimeoutExpired:
+            worker = {"worker": {"error": f"timeout after {timeout} s"}}
+        for phase, result in worker.items():
+            merged = results.setdefault(phase, {})
+            if "error" in result:
+                merged["error"] = result["error"]
+            if "time" in result:
+                merged["time"] = min(merged.get("time", float("inf")), result["time"])
+            if "peak_memory" in result:
+                merged["peak_memory"] = result["peak_memory"]
+    return results
+
+
+def measure_startup(repeat: int, timeout: float) -> dict:
+    """Runs Editor2 until its first frame (the window is drawn) repeat times
+
+    Returns:
+        dict: {"time": s} (the minimum, incl. the interpreter startup and the imports) or {"error": message}
+    """
+    command = [sys.executable, os.path.join(ROOT, "Editor2", "Editor2.py"), "--first-frame"]
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        try:
+            process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return {"error": f"timeout after {timeout} s"}
+        if process.returncode:
+            return {"error": process.stderr.strip()[-500:]}
+        times.append(time.perf_counter() - t)
+    return {"time": min(times)}
+
+
+def git_commit() -> tuple[str, bool]:
+    """Returns the commit hash of the repository and whether there are uncommitted changes
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True).stdout
+    except OSError:
+        return "", False
+    return commit, bool(status.strip())
+
+
+def compare_to_baseline(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Returns the regressions: the phases, that are slower than in the baseline by more than threshold
+    (fraction) and MIN_DIFFERENCE
+    """
+    regressions = []
+    for case, phases in report["results"].items():
+        for phase, result in phases.items():
+            base = baseline["results"].get(case, {}).get(phase, {})
+            if "time" not in result or "time" not in base:
+                continue
+            if result["time"] > base["time"] * (1 + threshold) and result["time"] - base["time"] > MIN_DIFFERENCE:
+                regressions.append(f"{case} {phase}: {result['time']:.3f} s, baseline {base['time']:.3f} s "
+                                   f"(+{result['time'] / base['time'] - 1:.0%})")
+    return regressions
+
+
+def print_report(report: dict) -> None:
+    print(f"{'case':32}" + "".join(f"{phase:>18}" for phase in PHASES))
+    for case, phases in report["results"].items():
+        cells = []
+        for phase in PHASES:
+            result = phases.get(phase, {})
+            if "error" in result:
+                cells.append(f"{result['error'].split(':')[0][:16]:>18}")
+            elif "time" in result:
+                memory = result.get("peak_memory", 0) / 2**20
+                cells.append(f"{result['time']:9.3f}s{memory:7.1f}MB")
+            else:
+                cells.append(f"{'-':>18}")
+        print(f"{case:32}" + "".join(cells))
+        if "worker" in phases:  # the worker process failed
+            print("    " + phases["worker"]["error"].strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Headless benchmarks of the JSON editors")
+    parser.add_argument("--editors", nargs="+", default=EDITORS, choices=EDITORS)
+    parser.add_argument("--shapes", nargs="+", default=list(generators.SHAPES), choices=list(generators.SHAPES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, help="approx. numbers of tree nodes")
+    parser.add_argument("--lazy", action="store_true", help="run the editors in lazy mode")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the minimum time is reported")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="max. time [s] of a worker process")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "json_editor_benchmark_data"))
+    parser.add_argument("--report", default="benchmark_report.json", help="JSON report of this run")
+    parser.add_argument("--baseline", help="JSON report, that this run is compared to")
+    parser.add_argument("--save-baseline", help="stores the report of this run as baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="max. slowdown (fraction) vs. the baseline")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET, help="max. time [s] to the first frame of Editor2")
+    parser.add_argument("--display", help="use this X display instead of starting Xvfb")
+    parser.add_argument("--worker", nargs=2, metavar=("EDITOR", "FILE"), help=argparse.SUPPRESS)
+    parser.add_argument("--trace-memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(*args.worker, args.lazy, args.trace_memory)))
+        return 0
+
+    commit, dirty = git_commit()
+    report = {"commit": commit, "dirty": dirty, "date": datetime.datetime.now().isoformat(timespec="seconds"),
+              "python": platform.python_version(), "platform": platform.platform(), "lazy": args.lazy,
+              "repeat": args.repeat, "nodes": {}, "results": {}, "startup": {}}
+    if args.display:
+        os.environ["DISPLAY"] = args.display
+    with contextlib.nullcontext() if args.display else virtual_display():
+        report["startup"] = measure_startup(args.repeat, args.timeout)
+        for shape in args.shapes:
+            for size in args.sizes:
+                fp, nodes = generators.generate_file(shape, size, args.data_dir)
+                report["nodes"][f"{shape}/{size}"] = nodes
+                for editor in args.editors:
+                    case = f"{editor}/{shape}/{size}"
+                    print(f"{case} ({nodes} nodes) ...", file=sys.stderr)
+                    report["results"][case] = run_case(editor, fp, args.lazy, args.repeat, args.timeout)
+
+    with open(args.report, "w") as file:
+        json.dump(report, file, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(report, file, indent=2)
+    print_report(report)
+    startup = report["startup"]
+    over_budget = "time" not in startup or startup["time"] > args.startup_budget
+    result = f"{startup['time']:.3f} s" if "time" in startup else f"failed ({startup['error'].strip()[-200:]})"
+    print(f"\nEditor2 first frame: {result}, budget {args.startup_budget:.3f} s" + (" OVER BUDGET" if over_budget else ""))
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        regressions = compare_to_baseline(report, baseline, args.threshold)
+        print(f"\nbaseline {baseline.get('commit', '')[:10]}, threshold {args.threshold:.0%}: "
+              f"{len(regressions)} regressions")
+        for regression in regressions:
+            print("  SLOWER " + regression)
+        return 1 if regressions or over_budget else 0
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())